@@ -0,0 +1,48 @@
+"""add_runs_and_checkpoints
+
+Revision ID: 8b3e6f2d4c10
+Revises: 5d1f0c7a9e21
+Create Date: 2026-10-18 09:30:00.000000+00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = '8b3e6f2d4c10'
+down_revision: Union[str, None] = '5d1f0c7a9e21'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('everapply_runs',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('kind', sa.String(), nullable=False),
+    sa.Column('status', sa.Enum('RUNNING', 'COMPLETED', 'FAILED', name='runstatus'), nullable=False),
+    sa.Column('stats', postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+    sa.Column('started_at', sa.DateTime(), nullable=True),
+    sa.Column('finished_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('everapply_run_users',
+    sa.Column('run_id', sa.UUID(), nullable=False),
+    sa.Column('user_id', sa.UUID(), nullable=False),
+    sa.Column('status', sa.Enum('PENDING', 'FETCHED', 'DONE', name='runuserstatus'), nullable=False),
+    sa.Column('job_ids', postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+    sa.Column('matches_created', sa.Integer(), nullable=False, server_default='0'),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['run_id'], ['everapply_runs.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['user_id'], ['everapply_users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('run_id', 'user_id')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('everapply_run_users')
+    op.drop_table('everapply_runs')
+    sa.Enum(name='runuserstatus').drop(op.get_bind(), checkfirst=True)
+    sa.Enum(name='runstatus').drop(op.get_bind(), checkfirst=True)
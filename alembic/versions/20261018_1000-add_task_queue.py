@@ -0,0 +1,50 @@
+"""add_task_queue
+
+Revision ID: e4a7c2b19d35
+Revises: 8b3e6f2d4c10
+Create Date: 2026-10-18 10:00:00.000000+00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = 'e4a7c2b19d35'
+down_revision: Union[str, None] = '8b3e6f2d4c10'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('everapply_tasks',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('kind', sa.String(), nullable=False),
+    sa.Column('payload', postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+    sa.Column('unique_key', sa.String(), nullable=True),
+    sa.Column('status', sa.Enum('QUEUED', 'RUNNING', 'DONE', 'FAILED', name='taskstatus'), nullable=False),
+    sa.Column('attempts', sa.Integer(), nullable=False, server_default='0'),
+    sa.Column('max_attempts', sa.Integer(), nullable=False, server_default='3'),
+    sa.Column('run_at', sa.DateTime(), nullable=False),
+    sa.Column('locked_by', sa.String(), nullable=True),
+    sa.Column('locked_at', sa.DateTime(), nullable=True),
+    sa.Column('result', postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+    sa.Column('last_error', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('finished_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_everapply_tasks_status_run_at', 'everapply_tasks', ['status', 'run_at'])
+    op.create_index(
+        'uq_everapply_tasks_active_unique_key', 'everapply_tasks', ['unique_key'],
+        unique=True, postgresql_where=sa.text("status IN ('QUEUED', 'RUNNING')"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('uq_everapply_tasks_active_unique_key', table_name='everapply_tasks')
+    op.drop_index('ix_everapply_tasks_status_run_at', table_name='everapply_tasks')
+    op.drop_table('everapply_tasks')
+    sa.Enum(name='taskstatus').drop(op.get_bind(), checkfirst=True)
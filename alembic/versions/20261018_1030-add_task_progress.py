@@ -0,0 +1,26 @@
+"""add_task_progress
+
+Revision ID: a9c3d5e7f102
+Revises: e4a7c2b19d35
+Create Date: 2026-10-18 10:30:00.000000+00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = 'a9c3d5e7f102'
+down_revision: Union[str, None] = 'e4a7c2b19d35'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('everapply_tasks', sa.Column('progress', postgresql.JSONB(astext_type=sa.Text()), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('everapply_tasks', 'progress')
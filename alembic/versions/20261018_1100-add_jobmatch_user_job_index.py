@@ -0,0 +1,26 @@
+"""add_jobmatch_user_job_index
+
+Revision ID: c2f8e1a4b657
+Revises: a9c3d5e7f102
+Create Date: 2026-10-18 11:00:00.000000+00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c2f8e1a4b657'
+down_revision: Union[str, None] = 'a9c3d5e7f102'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_everapply_jobmatches_user_id_job_id', 'everapply_jobmatches', ['user_id', 'job_id'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_everapply_jobmatches_user_id_job_id', table_name='everapply_jobmatches')
@@ -0,0 +1,43 @@
+"""add_usage_events
+
+Revision ID: d7b4a9e2c318
+Revises: c2f8e1a4b657
+Create Date: 2026-10-18 11:30:00.000000+00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd7b4a9e2c318'
+down_revision: Union[str, None] = 'c2f8e1a4b657'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('everapply_usage',
+    sa.Column('id', sa.BigInteger(), autoincrement=True, nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('provider', sa.String(length=16), nullable=False),
+    sa.Column('feature', sa.String(length=16), nullable=False),
+    sa.Column('user_id', sa.UUID(), nullable=True),
+    sa.Column('run_id', sa.UUID(), nullable=True),
+    sa.Column('task_id', sa.UUID(), nullable=True),
+    sa.Column('model', sa.String(), nullable=True),
+    sa.Column('prompt_tokens', sa.Integer(), nullable=False),
+    sa.Column('completion_tokens', sa.Integer(), nullable=False),
+    sa.Column('cache_hit_tokens', sa.Integer(), nullable=False),
+    sa.Column('cache_miss_tokens', sa.Integer(), nullable=False),
+    sa.Column('results', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_everapply_usage_created_at', 'everapply_usage', ['created_at'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_everapply_usage_created_at', table_name='everapply_usage')
+    op.drop_table('everapply_usage')
@@ -0,0 +1,33 @@
+"""add_board_cache
+
+Revision ID: f1c6d8b3a520
+Revises: d7b4a9e2c318
+Create Date: 2026-10-18 12:00:00.000000+00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = 'f1c6d8b3a520'
+down_revision: Union[str, None] = 'd7b4a9e2c318'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('everapply_board_cache',
+    sa.Column('url', sa.String(), nullable=False),
+    sa.Column('etag', sa.String(), nullable=True),
+    sa.Column('last_modified', sa.String(), nullable=True),
+    sa.Column('posting_hashes', postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+    sa.Column('fetched_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('url')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('everapply_board_cache')
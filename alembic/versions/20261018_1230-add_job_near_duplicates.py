@@ -0,0 +1,40 @@
+"""add_job_near_duplicates
+
+Revision ID: b8e2f4c6d913
+Revises: f1c6d8b3a520
+Create Date: 2026-10-18 12:30:00.000000+00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = 'b8e2f4c6d913'
+down_revision: Union[str, None] = 'f1c6d8b3a520'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Existing jobs keep null signatures — they expire within a day and new ones are hashed at ingest
+    op.add_column('everapply_jobs', sa.Column('minhash', postgresql.ARRAY(sa.BigInteger()), nullable=True))
+    op.add_column('everapply_jobs', sa.Column('lsh_buckets', postgresql.ARRAY(sa.BigInteger()), nullable=True))
+    op.add_column('everapply_jobs', sa.Column('canonical_job_id', sa.UUID(), nullable=True))
+    op.create_foreign_key(
+        'everapply_jobs_canonical_job_id_fkey', 'everapply_jobs', 'everapply_jobs',
+        ['canonical_job_id'], ['id'], ondelete='SET NULL',
+    )
+    op.create_index('ix_everapply_jobs_lsh_buckets', 'everapply_jobs', ['lsh_buckets'], postgresql_using='gin')
+    op.create_index('ix_everapply_jobs_canonical_job_id', 'everapply_jobs', ['canonical_job_id'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_everapply_jobs_canonical_job_id', table_name='everapply_jobs')
+    op.drop_index('ix_everapply_jobs_lsh_buckets', table_name='everapply_jobs')
+    op.drop_constraint('everapply_jobs_canonical_job_id_fkey', 'everapply_jobs', type_='foreignkey')
+    op.drop_column('everapply_jobs', 'canonical_job_id')
+    op.drop_column('everapply_jobs', 'lsh_buckets')
+    op.drop_column('everapply_jobs', 'minhash')
@@ -0,0 +1,66 @@
+"""add_job_features
+
+Revision ID: e3a9c5d7f214
+Revises: b8e2f4c6d913
+Create Date: 2026-10-18 13:00:00.000000+00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = 'e3a9c5d7f214'
+down_revision: Union[str, None] = 'b8e2f4c6d913'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+seniority = postgresql.ENUM('JUNIOR', 'MID', 'SENIOR', name='seniority', create_type=False)
+
+# services/prefilter.py _STOPWORDS — left out of description_tokens, like bare numbers
+STOPWORDS = (
+    "a an and are as at be but by can for from has have in is it its of on or our that the their "
+    "this to we will with you your"
+).split()
+STOPWORDS_SQL = "ARRAY[" + ", ".join(f"'{word}'" for word in STOPWORDS) + "]"
+
+
+def upgrade() -> None:
+    seniority.create(op.get_bind(), checkfirst=True)
+    op.add_column('everapply_jobs', sa.Column('requires_clearance', sa.Boolean(), server_default=sa.false(), nullable=False))
+    op.add_column('everapply_jobs', sa.Column('seniority_hint', seniority, nullable=True))
+    op.add_column('everapply_jobs', sa.Column('description_tokens', postgresql.ARRAY(sa.String()), nullable=True))
+    op.add_column('everapply_jobs', sa.Column('description_length', sa.Integer(), server_default='0', nullable=False))
+
+    # Backfill with the same rules as services/features.py (\y is a word boundary in Postgres regexes)
+    op.execute(r"""
+        UPDATE everapply_jobs SET
+            requires_clearance = lower(coalesce(description, '')) ~ '(clearance|ts/sci|top secret)',
+            seniority_hint = CASE
+                WHEN lower(title) ~ '\y(senior|sr|lead|staff|principal|head|director)\y' THEN 'SENIOR'
+                WHEN lower(title) ~ '\y(junior|jr|entry[- ]level|associate|intern|internship|graduate|new grad)\y' THEN 'JUNIOR'
+                WHEN lower(title) ~ '\y(mid[- ]level|intermediate)\y' THEN 'MID'
+            END::seniority,
+            description_tokens = ARRAY(
+                SELECT DISTINCT m[1]
+                FROM regexp_matches(lower(coalesce(description, '')), '([a-z0-9+#]+(?:\.[a-z0-9+#]+)*)', 'g') AS m
+                WHERE m[1] <> ALL({stopwords}) AND m[1] !~ '^[0-9]+$'
+                ORDER BY 1
+            ),
+            description_length = length(coalesce(description, ''))
+    """.format(stopwords=STOPWORDS_SQL))
+
+    op.create_index('ix_everapply_jobs_seniority_hint', 'everapply_jobs', ['seniority_hint'])
+    op.create_index('ix_everapply_jobs_description_tokens', 'everapply_jobs', ['description_tokens'], postgresql_using='gin')
+
+
+def downgrade() -> None:
+    op.drop_index('ix_everapply_jobs_description_tokens', table_name='everapply_jobs')
+    op.drop_index('ix_everapply_jobs_seniority_hint', table_name='everapply_jobs')
+    op.drop_column('everapply_jobs', 'description_length')
+    op.drop_column('everapply_jobs', 'description_tokens')
+    op.drop_column('everapply_jobs', 'seniority_hint')
+    op.drop_column('everapply_jobs', 'requires_clearance')
+    seniority.drop(op.get_bind(), checkfirst=True)
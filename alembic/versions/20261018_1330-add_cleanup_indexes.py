@@ -0,0 +1,26 @@
+"""add_cleanup_indexes
+
+Revision ID: a4d2f7b9c861
+Revises: e3a9c5d7f214
+Create Date: 2026-10-18 13:30:00.000000+00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = 'a4d2f7b9c861'
+down_revision: Union[str, None] = 'e3a9c5d7f214'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_everapply_jobs_expires_at', 'everapply_jobs', ['expires_at'])
+    op.create_index('ix_everapply_jobmatches_job_id', 'everapply_jobmatches', ['job_id'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_everapply_jobmatches_job_id', table_name='everapply_jobmatches')
+    op.drop_index('ix_everapply_jobs_expires_at', table_name='everapply_jobs')
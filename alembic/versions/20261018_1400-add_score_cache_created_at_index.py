@@ -0,0 +1,24 @@
+"""add_score_cache_created_at_index
+
+Revision ID: b8e1c3f5a027
+Revises: a4d2f7b9c861
+Create Date: 2026-10-18 14:00:00.000000+00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = 'b8e1c3f5a027'
+down_revision: Union[str, None] = 'a4d2f7b9c861'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_everapply_score_cache_created_at', 'everapply_score_cache', ['created_at'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_everapply_score_cache_created_at', table_name='everapply_score_cache')
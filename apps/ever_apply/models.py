@@ -1,7 +1,7 @@
 import enum
 import uuid
-from sqlalchemy import Column, String, Float, ForeignKey, DateTime, Text, Enum, Boolean, Integer
-from sqlalchemy.dialects.postgresql import UUID, JSONB
+from sqlalchemy import BigInteger, Column, String, Float, ForeignKey, DateTime, Text, Enum, Boolean, Integer, Index, text
+from sqlalchemy.dialects.postgresql import ARRAY, UUID, JSONB
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from core.database import Base
@@ -22,6 +22,22 @@ class Seniority(str, enum.Enum):
     MID = "mid"
     SENIOR = "senior"
 
+class RunStatus(str, enum.Enum):
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+class TaskStatus(str, enum.Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+
+class RunUserStatus(str, enum.Enum):
+    PENDING = "pending"
+    FETCHED = "fetched"
+    DONE = "done"
+
 class User(Base):
     __tablename__ = "everapply_users"
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
@@ -78,7 +94,25 @@ class Job(Base):
     source_url = Column(String, unique=True, nullable=False)
     raw_json = Column(JSONB, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow)
+    # Near-duplicate detection — see services/minhash.py. Null when the text is too short to compare
+    minhash = Column(ARRAY(BigInteger), nullable=True)
+    lsh_buckets = Column(ARRAY(BigInteger), nullable=True)
+    # Earliest job this one is a near-duplicate of (repost / other source); null for canonical jobs
+    canonical_job_id = Column(UUID(as_uuid=True), ForeignKey("everapply_jobs.id", ondelete="SET NULL"), nullable=True)
+    # Job features computed once at ingest (services/features.py) — read by the per-user filters
+    requires_clearance = Column(Boolean, default=False, nullable=False)
+    seniority_hint = Column(Enum(Seniority), nullable=True)  # Only when the title states it
+    description_tokens = Column(ARRAY(String), nullable=True)  # Prefilter tokens — see prefilter.description_tokens
+    description_length = Column(Integer, default=0, nullable=False)
     matches = relationship("JobMatch", back_populates="job")
+    __table_args__ = (
+        Index("ix_everapply_jobs_lsh_buckets", "lsh_buckets", postgresql_using="gin"),
+        Index("ix_everapply_jobs_canonical_job_id", "canonical_job_id"),
+        Index("ix_everapply_jobs_seniority_hint", "seniority_hint"),
+        Index("ix_everapply_jobs_description_tokens", "description_tokens", postgresql_using="gin"),
+        # Backs cleanup_job's scan for expired jobs
+        Index("ix_everapply_jobs_expires_at", "expires_at"),
+    )
 
 class JobMatch(Base):
     __tablename__ = "everapply_jobmatches"
@@ -93,3 +127,106 @@ class JobMatch(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
     user = relationship("User", back_populates="matches")
     job = relationship("Job", back_populates="matches")
+    __table_args__ = (
+        # Backs the per-user "already matched?" anti-join in candidate selection
+        Index("ix_everapply_jobmatches_user_id_job_id", "user_id", "job_id"),
+        # Backs cleanup_job's protected-job anti-join and its match delete by job
+        Index("ix_everapply_jobmatches_job_id", "job_id"),
+    )
+
+class ScoreCache(Base):
+    """DeepSeek score keyed by a hash of everything that went into the prompt — see services/score_cache.py."""
+    __tablename__ = "everapply_score_cache"
+    key = Column(String(64), primary_key=True)
+    score = Column(Float, nullable=False)
+    reason = Column(String, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    __table_args__ = (
+        Index("ix_everapply_score_cache_created_at", "created_at"),  # cleanup_job prunes by age
+    )
+
+
+class BoardCache(Base):
+    """Conditional-request validators + per-posting content hashes for one Greenhouse/Lever board — see services/board_cache.py."""
+    __tablename__ = "everapply_board_cache"
+    url = Column(String, primary_key=True)
+    etag = Column(String, nullable=True)
+    last_modified = Column(String, nullable=True)  # Sent back verbatim as If-Modified-Since
+    posting_hashes = Column(JSONB, nullable=False, default=dict)  # {posting source_url: content hash} from the last 200
+    fetched_at = Column(DateTime, default=datetime.utcnow)
+
+
+class Run(Base):
+    """One scheduler/admin pipeline run. A RUNNING row left behind by a crash or redeploy is resumed."""
+    __tablename__ = "everapply_runs"
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    kind = Column(String, nullable=False)
+    status = Column(Enum(RunStatus), default=RunStatus.RUNNING, nullable=False)
+    stats = Column(JSONB, nullable=True)
+    started_at = Column(DateTime, default=datetime.utcnow)
+    finished_at = Column(DateTime, nullable=True)
+
+class RunUser(Base):
+    """Per-user checkpoint within a Run — committed together with that user's jobs or matches."""
+    __tablename__ = "everapply_run_users"
+    run_id = Column(UUID(as_uuid=True), ForeignKey("everapply_runs.id", ondelete="CASCADE"), primary_key=True)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("everapply_users.id", ondelete="CASCADE"), primary_key=True)
+    status = Column(Enum(RunUserStatus), default=RunUserStatus.PENDING, nullable=False)
+    job_ids = Column(JSONB, nullable=True)  # Jobs fetched for this user — reused on resume instead of calling Apify again
+    matches_created = Column(Integer, default=0, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow)
+
+# Matches the partial unique index below — ON CONFLICT inference needs the predicate as literal SQL
+ACTIVE_TASK_PREDICATE = "status IN ('QUEUED', 'RUNNING')"
+
+class Task(Base):
+    """Durable work item — enqueued by cron/admin, claimed by workers with FOR UPDATE SKIP LOCKED."""
+    __tablename__ = "everapply_tasks"
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    kind = Column(String, nullable=False)
+    payload = Column(JSONB, nullable=True)
+    unique_key = Column(String, nullable=True)  # At most one queued/running task per key
+    status = Column(Enum(TaskStatus), default=TaskStatus.QUEUED, nullable=False)
+    attempts = Column(Integer, default=0, nullable=False)
+    max_attempts = Column(Integer, default=3, nullable=False)
+    run_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    locked_by = Column(String, nullable=True)
+    locked_at = Column(DateTime, nullable=True)  # Heartbeat — a stale value means the worker died
+    progress = Column(JSONB, nullable=True)  # Live RunStats counters, refreshed by the worker while running
+    result = Column(JSONB, nullable=True)
+    last_error = Column(Text, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    finished_at = Column(DateTime, nullable=True)
+    __table_args__ = (
+        Index("ix_everapply_tasks_status_run_at", "status", "run_at"),
+        Index(
+            "uq_everapply_tasks_active_unique_key",
+            "unique_key",
+            unique=True,
+            postgresql_where=text(ACTIVE_TASK_PREDICATE),
+        ),
+    )
+
+
+class UsageEvent(Base):
+    """
+    One metered external call — a DeepSeek completion or an Apify actor run. Append-only;
+    scripts/usage_report.py --actual aggregates it. No foreign keys, so history survives user/run/task deletion.
+    """
+    __tablename__ = "everapply_usage"
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    provider = Column(String(16), nullable=False)  # "deepseek" | "apify"
+    feature = Column(String(16), nullable=False)   # score, parse, ats, ideal, realistic, fetch
+    user_id = Column(UUID(as_uuid=True), nullable=True)
+    run_id = Column(UUID(as_uuid=True), nullable=True)   # everapply_runs id when the call ran inside a fetch_and_score run
+    task_id = Column(UUID(as_uuid=True), nullable=True)  # Task id when the call ran inside a worker task
+    model = Column(String, nullable=True)
+    prompt_tokens = Column(Integer, default=0, nullable=False)
+    completion_tokens = Column(Integer, default=0, nullable=False)
+    cache_hit_tokens = Column(Integer, default=0, nullable=False)
+    cache_miss_tokens = Column(Integer, default=0, nullable=False)
+    results = Column(Integer, default=0, nullable=False)  # Apify dataset items (billed per result)
+    __table_args__ = (
+        Index("ix_everapply_usage_created_at", "created_at"),
+    )
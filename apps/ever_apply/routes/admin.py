@@ -1,26 +1,15 @@
+import json
+from uuid import UUID
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
 from fastapi.security import APIKeyHeader
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, delete, and_
-from datetime import datetime, timedelta
-
-CLEARANCE_KEYWORDS = ["clearance", "ts/sci", "top secret", "dod clearance", "secret clearance", "security clearance"]
-
-def requires_clearance(description: str) -> bool:
-    desc = description.lower()
-    return any(kw in desc for kw in CLEARANCE_KEYWORDS)
 
 from core.config import settings
 from core.database import get_db
-from apps.ever_apply.models import Job, JobMatch, User
-
-
-def _is_eligible(user) -> bool:
-    """Returns True if this user should receive an Apify fetch run."""
-    if user.is_whitelisted or user.is_paid:
-        return True
-    trial_cutoff = datetime.utcnow() - timedelta(days=settings.EVER_APPLY_TRIAL_DAYS)
-    return user.created_at >= trial_cutoff
+from core.realtime import realtime
+from apps.ever_apply.models import Task, TaskStatus
+from apps.ever_apply.services.tasks import TASK_CHANNEL, enqueue_once, task_snapshot
 
 
 router = APIRouter()
@@ -34,196 +23,98 @@ def verify_admin_key(key: str = Depends(api_key_header)):
         raise HTTPException(status_code=403, detail="Invalid admin key")
 
 
+async def _enqueue(db: AsyncSession, kind: str) -> dict:
+    """
+    Queue a task for the workers and return its id right away — follow it with
+    GET /admin/tasks/{task_id} or the /events stream. A second click while one is
+    queued/running returns the same task.
+    """
+    task_id, created = await enqueue_once(db, kind)
+    return {"task_id": str(task_id), "queued": created}
+
+
 # POST /admin/cleanup-jobs
-# Deletes expired jobs that have not been saved or applied
+# Queues deletion of expired jobs that have not been saved or applied
 @router.post("/cleanup-jobs", dependencies=[Depends(verify_admin_key)])
 async def cleanup_jobs(db: AsyncSession = Depends(get_db)):
-    # Find job IDs that are saved or applied — never delete these
-    protected = await db.execute(
-        select(JobMatch.job_id).where(
-            JobMatch.status.in_(["saved", "applied"])
-        )
-    )
-    protected_ids = {row[0] for row in protected.fetchall()}
-
-    # Find expired job IDs that are safe to delete
-    expired = await db.execute(
-        select(Job.id).where(
-            Job.expires_at < datetime.utcnow(),
-            Job.id.not_in(protected_ids),
-        )
-    )
-    expired_ids = [row[0] for row in expired.fetchall()]
-
-    if not expired_ids:
-        return {"deleted": 0}
-
-    # Delete their matches first to satisfy the FK constraint
-    await db.execute(delete(JobMatch).where(JobMatch.job_id.in_(expired_ids)))
-
-    # Now delete the jobs
-    result = await db.execute(delete(Job).where(Job.id.in_(expired_ids)))
-    await db.commit()
-    return {"deleted": result.rowcount}
+    return await _enqueue(db, "cleanup_jobs")
 
 
 # POST /admin/fetch-jobs
-# Manually trigger a scrape + score run for all eligible users (per-user Apify call)
+# Queues a scrape + score run for all eligible users — same run as the cron job
 @router.post("/fetch-jobs", dependencies=[Depends(verify_admin_key)])
 async def trigger_fetch(db: AsyncSession = Depends(get_db)):
-    from apps.ever_apply.services.scraper import fetch_indeed_jobs
-    from apps.ever_apply.services.scoring import score_match
-
-    # Fetch all users who have a parsed resume
-    users_result = await db.execute(
-        select(User).where(User.parsed_data.isnot(None))
-    )
-    users = users_result.scalars().all()
-    if not users:
-        return {"jobs_fetched": 0, "matches_created": 0, "reason": "no users with resumes"}
-
-    total_jobs = 0
-    matched = 0
-    for user in users:
-        if not user.scraping_enabled:
-            continue
-        if not _is_eligible(user):
-            continue
-
-        # User-specific keywords from their parsed titles
-        keywords = list(dict.fromkeys(user.parsed_data.get("titles", [])))[:5] or ["software engineer", "developer"]
-
-        # Location: only pass it for onsite/hybrid users
-        prefs = user.preferences or {}
-        remote_pref = prefs.get("remote_type")
-        location = prefs.get("preferred_location", "") if remote_pref in ("onsite", "hybrid") else ""
-
-        jobs = await fetch_indeed_jobs(keywords, location, remote=remote_pref == "remote")
-        total_jobs += len(jobs)
-
-        for job_data in jobs:
-            if not job_data.get("source_url"):
-                continue
-
-            # Upsert job — skip if source_url already exists
-            existing = await db.execute(
-                select(Job).where(Job.source_url == job_data["source_url"])
-            )
-            job = existing.scalar_one_or_none()
-            if not job:
-                job = Job(**{k: v for k, v in job_data.items() if k != "raw_json"}, raw_json=job_data.get("raw_json"))
-                db.add(job)
-                await db.flush()
-
-            summary = user.parsed_data.get("summary", "")
-            skills = ", ".join(user.parsed_data.get("skills", []))
-            resume_context = f"Summary: {summary}\nSkills: {skills}"
-            description = job_data.get("description", "")
-            if not summary or not description:
-                continue
-
-            # Remote type filter
-            if remote_pref and job.remote_type and job.remote_type != remote_pref:
-                continue
-
-            if prefs.get("exclude_clearance") and requires_clearance(description):
-                continue
-
-            # Skip if already matched by job ID
-            existing_match = await db.execute(
-                select(JobMatch).where(
-                    and_(JobMatch.user_id == user.id, JobMatch.job_id == job.id)
-                )
-            )
-            if existing_match.scalar_one_or_none() is not None:
-                continue
-
-            # Skip if already matched a job with same title + company (different URL)
-            existing_title_match = await db.execute(
-                select(JobMatch)
-                .join(Job)
-                .where(
-                    and_(
-                        JobMatch.user_id == user.id,
-                        Job.title == job_data["title"],
-                        Job.company == job_data["company"],
-                    )
-                )
-            )
-            if existing_title_match.scalar_one_or_none() is not None:
-                continue
-
-            result = await score_match(resume_context, description, user_preferences=prefs)
-            score = result.get("score", 0)
-            reason = result.get("reason", "")
-            db.add(JobMatch(user_id=user.id, job_id=job.id, score=score, reason=reason))
-            matched += 1
-
-    await db.commit()
-    return {"jobs_fetched": total_jobs, "matches_created": matched}
+    return await _enqueue(db, "fetch_and_score")
 
 
 # POST /admin/score-jobs
-# Score existing DB jobs against all users — no Apify call
+# Queues scoring of existing DB jobs against all users — no Apify call
 @router.post("/score-jobs", dependencies=[Depends(verify_admin_key)])
 async def trigger_score(db: AsyncSession = Depends(get_db)):
-    from apps.ever_apply.services.scoring import score_match
-
-    users_result = await db.execute(
-        select(User).where(User.parsed_data.isnot(None))
+    return await _enqueue(db, "score_jobs")
+
+
+# GET /admin/tasks/{task_id}
+# Status of a queued task — progress holds live counters while running, result the handler's return value once done
+@router.get("/tasks/{task_id}", dependencies=[Depends(verify_admin_key)])
+async def get_task(task_id: UUID, db: AsyncSession = Depends(get_db)):
+    task = await db.get(Task, task_id)
+    if not task:
+        raise HTTPException(status_code=404, detail="Task not found.")
+    return task_snapshot(task)
+
+
+# GET /admin/tasks/{task_id}/events
+# SSE stream of a task's status + progress (users processed, jobs fetched, LLM calls, errors)
+@router.get("/tasks/{task_id}/events", dependencies=[Depends(verify_admin_key)])
+async def task_events(task_id: UUID, db: AsyncSession = Depends(get_db)):
+    """
+    Starts with the current snapshot, then one event per worker update (every
+    EVER_APPLY_PROGRESS_SECONDS) until the task is done or failed. Test with curl:
+        curl -N -H "X-Admin-Key: ..." http://localhost:8000/ever-apply/admin/tasks/<id>/events
+    """
+    from core.database import AsyncSessionLocal
+
+    if not await db.get(Task, task_id):
+        raise HTTPException(status_code=404, detail="Task not found.")
+    finished = {TaskStatus.DONE.value, TaskStatus.FAILED.value}
+
+    def _is_this_task(payload: str) -> bool:
+        return json.loads(payload).get("task_id") == str(task_id)
+
+    async def _events():
+        stream = realtime.sse_generator(TASK_CHANNEL, match=_is_this_task)
+        try:
+            # Subscribe before reading the snapshot so no update lands in between
+            yield await anext(stream)
+
+            async with AsyncSessionLocal() as session:
+                snapshot = task_snapshot(await session.get(Task, task_id))
+            yield f"data: {json.dumps(snapshot, default=str)}\n\n"
+            if snapshot["status"] in finished:
+                return
+
+            async for event in stream:
+                yield event
+                if event.startswith("data: ") and json.loads(event[len("data: "):]).get("status") in finished:
+                    return
+        finally:
+            await stream.aclose()
+
+    return StreamingResponse(
+        _events(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no",
+        },
     )
-    users = users_result.scalars().all()
-    if not users:
-        return {"jobs_scored": 0, "matches_created": 0, "reason": "no users with resumes"}
-
-    jobs_result = await db.execute(select(Job).where(Job.description != ""))
-    jobs = jobs_result.scalars().all()
-
-    matched = 0
-    scored = 0
-    for user in users:
-        if not user.scraping_enabled:
-            continue
-        if not _is_eligible(user):
-            continue
-
-        # Only fetch jobs not already matched for this user — avoids redundant DeepSeek calls
-        already_matched = await db.execute(
-            select(JobMatch.job_id).where(JobMatch.user_id == user.id)
-        )
-        matched_job_ids = {row[0] for row in already_matched.fetchall()}
-
-        unscored_jobs = [j for j in jobs if j.id not in matched_job_ids]
-
-        for job in unscored_jobs:
-            # Skip jobs that don't match user's remote preference
-            remote_pref = (user.preferences or {}).get("remote_type")
-            if remote_pref and job.remote_type and job.remote_type != remote_pref:
-                continue
-
-            # For onsite/hybrid, filter by preferred_location (city/state string match)
-            preferred_location = (user.preferences or {}).get("preferred_location")
-            if remote_pref in ("onsite", "hybrid") and preferred_location and job.location:
-                city = preferred_location.split(",")[0].strip().lower()
-                if city not in job.location.lower():
-                    continue
-
-            summary = user.parsed_data.get("summary", "")
-            skills = ", ".join(user.parsed_data.get("skills", []))
-            resume_context = f"Summary: {summary}\nSkills: {skills}"
-            if not summary or not job.description:
-                continue
-
-            if (user.preferences or {}).get("exclude_clearance") and requires_clearance(job.description):
-                continue
-
-            result = await score_match(resume_context, job.description, user_preferences=user.preferences or {})
-            score = result.get("score", 0)
-            reason = result.get("reason", "")
-            scored += 1
-
-            db.add(JobMatch(user_id=user.id, job_id=job.id, score=score, reason=reason))
-            matched += 1
-
-    await db.commit()
-    return {"jobs_scored": scored, "matches_created": matched}
+
+
+# GET /admin/llm-metrics
+# This process's DeepSeek limiter — current concurrency limit, in-flight/waiting calls, 429s, retries, latency
+@router.get("/llm-metrics", dependencies=[Depends(verify_admin_key)])
+async def llm_metrics():
+    from apps.ever_apply.services.llm import llm_metrics
+
+    return llm_metrics()
@@ -12,7 +12,8 @@ from core.database import get_db
 from apps.ever_apply.models import Job, JobMatch, MatchStatus, User
 from apps.ever_apply.schemas import JobMatchRead, MatchStatusUpdate
 from apps.ever_apply.services.clerk import get_current_clerk_user
-from apps.ever_apply.services.ats_resume import _r2_client
+from apps.ever_apply.services.storage import r2_client
+from apps.ever_apply.services.usage import usage_context
 
 router = APIRouter()
 
@@ -178,7 +179,8 @@ async def generate_ats_resume(
     )
 
     resume_text = await download_resume_text(user.resume_url)
-    ats_data = await generate_ats_content(resume_text, match.job.description)
+    with usage_context(user_id=user.id):
+        ats_data = await generate_ats_content(resume_text, match.job.description)
     pdf_bytes = build_pdf(ats_data)
     ats_url = await upload_ats_resume(pdf_bytes, clerk_user["sub"], match_id)
 
@@ -218,7 +220,7 @@ async def get_ats_resume(
         raise HTTPException(status_code=404, detail="ATS resume not generated yet.")
 
     key = urlparse(match.ats_resume_url).path.lstrip("/")
-    response = _r2_client().get_object(Bucket=settings.R2_BUCKET_NAME, Key=key)
+    response = r2_client().get_object(Bucket=settings.R2_BUCKET_NAME, Key=key)
     pdf_bytes = response["Body"].read()
 
     name = (user.parsed_data or {}).get("name", "Resume")
@@ -12,6 +12,7 @@ from core.database import get_db
 from apps.ever_apply.models import User
 from apps.ever_apply.services.clerk import get_current_clerk_user
 from apps.ever_apply.services.ats_resume import download_resume_text, generate_ats_content, generate_ideal_content, generate_realistic_content, build_pdf
+from apps.ever_apply.services.usage import usage_context
 
 router = APIRouter()
 
@@ -83,7 +84,8 @@ async def generate_targeted_resume(
         )
 
     resume_text = await download_resume_text(user.resume_url)
-    ats_data = await generate_ats_content(resume_text, body.job_description)
+    with usage_context(user_id=user.id):
+        ats_data = await generate_ats_content(resume_text, body.job_description)
     pdf_bytes = build_pdf(ats_data)
 
     # Increment counter and lifetime total
@@ -129,7 +131,8 @@ async def generate_ideal_resume(
             detail=f"Daily resume limit of {daily_limit} reached. Resets at midnight MT.",
         )
 
-    ats_data = await generate_ideal_content(body.job_description)
+    with usage_context(user_id=user.id):
+        ats_data = await generate_ideal_content(body.job_description)
     pdf_bytes = build_pdf(ats_data)
 
     user.custom_ats_count += 1
@@ -179,7 +182,8 @@ async def generate_ideal_realistic_resume(
         )
 
     resume_text = await download_resume_text(user.resume_url)
-    ats_data = await generate_realistic_content(resume_text, body.job_description)
+    with usage_context(user_id=user.id):
+        ats_data = await generate_realistic_content(resume_text, body.job_description)
     pdf_bytes = build_pdf(ats_data)
 
     user.custom_ats_count += 1
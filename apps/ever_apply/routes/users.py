@@ -10,7 +10,8 @@ from apps.ever_apply.models import User
 from apps.ever_apply.schemas import UserRead, UserPreferenceRead, UserPreferencesUpdate, ParsedDataUpdate, UserUpdate
 from apps.ever_apply.services.clerk import get_current_clerk_user
 from apps.ever_apply.services.resume import upload_resume, delete_resume, extract_text, parse_resume
-from apps.ever_apply.services.ats_resume import _r2_client
+from apps.ever_apply.services.storage import r2_client
+from apps.ever_apply.services.usage import usage_context
 
 router = APIRouter()
 
@@ -149,7 +150,7 @@ async def get_user_resume(
         raise HTTPException(status_code=404, detail="No resume uploaded yet.")
 
     key = urlparse(user.resume_url).path.lstrip("/")
-    response = _r2_client().get_object(Bucket=settings.R2_BUCKET_NAME, Key=key)
+    response = r2_client().get_object(Bucket=settings.R2_BUCKET_NAME, Key=key)
     pdf_bytes = response["Body"].read()
 
     name = (user.parsed_data or {}).get("name", "Resume")
@@ -194,7 +195,8 @@ async def upload_user_resume(
     resume_url = await upload_resume(file_bytes, file.filename, clerk_user["sub"])
 
     # 4. Parse with DeepSeek
-    parsed_data = await parse_resume(text)
+    with usage_context(user_id=user.id):
+        parsed_data = await parse_resume(text)
 
     # 5. Save to DB
     user.resume_url = resume_url
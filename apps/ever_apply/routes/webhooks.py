@@ -8,7 +8,7 @@ from core.config import settings
 from core.database import get_db
 from fastapi import Depends
 from apps.ever_apply.models import User, JobMatch
-from apps.ever_apply.services.resume import delete_resume
+from apps.ever_apply.services.storage import delete_objects, object_key
 
 logger = logging.getLogger("ever_apply.webhooks")
 
@@ -44,19 +44,22 @@ async def clerk_webhook(request: Request, db: AsyncSession = Depends(get_db)):
         # Already gone or never created — nothing to do
         return {"received": True}
 
-    # Delete resume from R2 if one exists
+    # Delete matches first (FK constraint) — their ATS resume URLs come back for the R2 cleanup
+    result = await db.execute(
+        delete(JobMatch).where(JobMatch.user_id == user.id).returning(JobMatch.ats_resume_url)
+    )
+    urls = [url for url in result.scalars() if url]
     if user.resume_url:
-        try:
-            await delete_resume(user.resume_url)
-        except Exception:
-            logger.exception(f"Failed to delete R2 resume for user {user.id}")
-
-    # Delete matches first (FK constraint)
-    await db.execute(delete(JobMatch).where(JobMatch.user_id == user.id))
+        urls.append(user.resume_url)
 
     # Delete user record
     await db.delete(user)
     await db.commit()
 
+    # Resume + ATS resumes removed from R2 in batched requests once the rows are gone
+    failed = await delete_objects([object_key(url) for url in urls])
+    if failed:
+        logger.error(f"Failed to delete {len(failed)} R2 file(s) for user {user.id}: {failed}")
+
     logger.info(f"clerk_webhook: deleted user {user.id} ({clerk_user_id}) and their data")
     return {"received": True}
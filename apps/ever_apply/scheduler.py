@@ -1,19 +1,49 @@
+import asyncio
+import functools
 import logging
 from datetime import datetime, timedelta
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.cron import CronTrigger
 from core.config import settings
+from core.leader import LeaderElection
+from apps.ever_apply.services.engine import MatchEngine, RunStats, UserContext
 
 logger = logging.getLogger("ever_apply.scheduler")
 
 scheduler = AsyncIOScheduler()
 
-CLEARANCE_KEYWORDS = ["clearance", "ts/sci", "top secret", "dod clearance", "secret clearance", "security clearance"]
+# Every web process/replica runs the scheduler, but only the advisory-lock leader fires its jobs —
+# and firing a job only enqueues a task; the workers (apps/ever_apply/worker.py) do the work.
+# A new leader (first boot or failover) re-queues whatever run the previous one left behind.
+leader = LeaderElection(
+    "ever_apply.scheduler",
+    retry_interval=settings.EVER_APPLY_LEADER_RETRY_SECONDS,
+    on_elected=lambda: scheduler.add_job(_leader_only(resume_interrupted_run)),
+)
+
+
+def _leader_only(job):
+    """Wrap a cron job so it is a no-op on every process except the current leader."""
+    @functools.wraps(job)
+    async def wrapper():
+        if not leader.is_leader:
+            logger.info(f"{job.__name__}: skipped — not the scheduler leader")
+            return None
+        return await job()
+    return wrapper
+
+
+def _enqueue(kind: str):
+    """Cron job that queues a `kind` task — one queued/running task per kind at a time."""
+    async def job():
+        from core.database import AsyncSessionLocal
+        from apps.ever_apply.services.tasks import enqueue_once
 
-
-def _requires_clearance(description: str) -> bool:
-    desc = description.lower()
-    return any(kw in desc for kw in CLEARANCE_KEYWORDS)
+        async with AsyncSessionLocal() as db:
+            task_id, created = await enqueue_once(db, kind)
+        logger.info(f"{kind}: {'queued task' if created else 'already queued/running as task'} {task_id}")
+    job.__name__ = f"enqueue_{kind}"
+    return job
 
 
 def _is_eligible(user) -> bool:
@@ -24,171 +54,387 @@ def _is_eligible(user) -> bool:
     return user.created_at >= trial_cutoff
 
 
-async def cleanup_job():
-    """Delete expired jobs that haven't been saved or applied, and clean up any ATS resume files from R2."""
+async def cleanup_job(stats: RunStats | None = None) -> dict:
+    """
+    Delete expired jobs that haven't been saved or applied, and clean up any ATS resume files from R2.
+    Then prune score cache entries older than EVER_APPLY_SCORE_CACHE_DAYS.
+    Works in chunks of EVER_APPLY_CLEANUP_CHUNK_SIZE rows — one statement and one commit each — so the
+    table size never shows up in a statement's size or a transaction's length. Returns counts.
+    """
     from core.database import AsyncSessionLocal
-    from sqlalchemy import select, delete
-    from datetime import datetime
+    from sqlalchemy import delete, exists, func, select
     from apps.ever_apply.models import Job, JobMatch
-    from apps.ever_apply.services.ats_resume import delete_ats_resume
+    from apps.ever_apply.services.score_cache import prune_scores
+    from apps.ever_apply.services.storage import delete_objects, object_key
 
+    deleted = scores_pruned = 0
+    ats_keys = []
     try:
-        async with AsyncSessionLocal() as db:
-            protected = await db.execute(
-                select(JobMatch.job_id).where(
-                    JobMatch.status.in_(["saved", "applied"])
-                )
-            )
-            protected_ids = {row[0] for row in protected.fetchall()}
-
-            expired = await db.execute(
-                select(Job.id).where(
+        while True:
+            # expired (anti-join on saved/applied matches) → delete its matches + the jobs, in one statement.
+            # The match and job deletes see the same snapshot; the FK is checked at statement end, once both ran.
+            doomed = (
+                select(Job.id)
+                .where(
                     Job.expires_at < datetime.utcnow(),
-                    Job.id.not_in(protected_ids),
+                    ~exists().where(JobMatch.job_id == Job.id, JobMatch.status.in_(["saved", "applied"])),
                 )
+                .limit(settings.EVER_APPLY_CLEANUP_CHUNK_SIZE)
+                .with_for_update(skip_locked=True)
+                .cte("doomed")
+            )
+            gone_matches = (
+                delete(JobMatch)
+                .where(JobMatch.job_id.in_(select(doomed.c.id)))
+                .returning(JobMatch.ats_resume_url)
+                .cte("gone_matches")
+            )
+            gone_jobs = delete(Job).where(Job.id.in_(select(doomed.c.id))).returning(Job.id).cte("gone_jobs")
+            stmt = select(
+                select(func.count()).select_from(gone_jobs).scalar_subquery(),
+                select(func.array_agg(gone_matches.c.ats_resume_url))
+                .where(gone_matches.c.ats_resume_url.isnot(None))
+                .scalar_subquery(),
             )
-            expired_ids = [row[0] for row in expired.fetchall()]
-
-            if expired_ids:
-                # Collect ATS resume URLs to delete from R2 after DB cleanup
-                ats_result = await db.execute(
-                    select(JobMatch.ats_resume_url).where(
-                        JobMatch.job_id.in_(expired_ids),
-                        JobMatch.ats_resume_url.isnot(None),
-                    )
-                )
-                ats_urls = [row[0] for row in ats_result.fetchall()]
 
-                await db.execute(delete(JobMatch).where(JobMatch.job_id.in_(expired_ids)))
-                result = await db.execute(delete(Job).where(Job.id.in_(expired_ids)))
+            async with AsyncSessionLocal() as db:
+                count, ats_urls = (await db.execute(stmt)).one()
                 await db.commit()
+            deleted += count
+            ats_keys.extend(object_key(url) for url in ats_urls or [])
 
-                for url in ats_urls:
-                    try:
-                        await delete_ats_resume(url)
-                    except Exception:
-                        logger.warning(f"cleanup_job: failed to delete ATS resume from R2: {url}")
+            if count < settings.EVER_APPLY_CLEANUP_CHUNK_SIZE:
+                break
 
-                logger.info(f"cleanup_job: deleted {result.rowcount} expired jobs, {len(ats_urls)} ATS resumes")
-            else:
-                logger.info("cleanup_job: nothing to delete")
+        # Score cache keys outlive their jobs (a repost hits the same key), so it ages out on its own clock
+        cache_cutoff = datetime.utcnow() - timedelta(days=settings.EVER_APPLY_SCORE_CACHE_DAYS)
+        while True:
+            async with AsyncSessionLocal() as db:
+                count = await prune_scores(db, cache_cutoff, settings.EVER_APPLY_CLEANUP_CHUNK_SIZE)
+                await db.commit()
+            scores_pruned += count
+            if count < settings.EVER_APPLY_CLEANUP_CHUNK_SIZE:
+                break
     except Exception:
         logger.exception("cleanup_job failed")
+        raise
+    finally:
+        # R2 files go only after their rows are committed — a failed delete leaves an orphan file, never a broken row.
+        # Every committed chunk's files go in a few batched DeleteObjects requests; failed keys get one retry.
+        failed = await delete_objects(ats_keys)
+        if failed:
+            failed = await delete_objects(failed)
+        if failed:
+            if stats:
+                stats.errors += len(failed)
+            logger.warning(f"cleanup_job: failed to delete {len(failed)} ATS resume(s) from R2: {failed[:10]}")
+
+    ats_resumes = len(ats_keys) - len(failed)
+    if deleted or scores_pruned:
+        logger.info(f"cleanup_job: deleted {deleted} expired jobs, {ats_resumes} ATS resumes, {scores_pruned} cached scores")
+    else:
+        logger.info("cleanup_job: nothing to delete")
+    return {"deleted": deleted, "ats_resumes": ats_resumes, "scores_pruned": scores_pruned}
+
+
+async def _fetch_group(group, match_engine: MatchEngine, board_jobs, run_id):
+    """
+    Stream one Apify search for a group of users, followed by the run's shared Greenhouse/Lever
+    board jobs. Each page is upserted and appended to the users' run checkpoint in one commit as it
+    arrives, then yielded as (job rows, Indeed results in the page) so scoring starts before the
+    last page is downloaded. Board postings unchanged since an earlier run come last, as the rows
+    already stored for them.
+    """
+    from core.database import AsyncSessionLocal
+    from apps.ever_apply.services.runs import add_fetched_jobs
+    from apps.ever_apply.services.scraper import stream_all_jobs
+
+    logger.info(
+        f"fetch_and_score: fetching for {len(group.user_ids)} user(s) — "
+        f"keywords={group.keywords}, location={group.location!r}, remote={group.remote}"
+    )
+    match_engine.stats.apify_calls += 1
+    async for jobs in stream_all_jobs(group.keywords, group.location, remote=group.remote, board_jobs=board_jobs):
+        match_engine.stats.jobs_fetched += len(jobs)
+        # Committed straight away — jobs are shared across users, so their row locks
+        # must not be held while anyone's scoring runs
+        async with AsyncSessionLocal() as db:
+            rows = await match_engine.ingest(db, jobs)
+            await add_fetched_jobs(db, run_id, group.user_ids, [row.id for row in rows])
+            await db.commit()
+        yield rows, sum(1 for job in jobs if job["source"] == "indeed")
+
+    # The stream already awaited the board task. Unchanged postings need no upsert but are still
+    # matched — a new user hasn't seen them; the engine's dedup skips jobs a user already has
+    unchanged = (await asyncio.shield(board_jobs)).rows if board_jobs is not None else []
+    if unchanged:
+        async with AsyncSessionLocal() as db:
+            await add_fetched_jobs(db, run_id, group.user_ids, [row.id for row in unchanged])
+            await db.commit()
+        yield unchanged, 0
 
 
-async def fetch_and_score():
-    """Fetch new jobs from Indeed and score them — one Apify call per eligible user."""
+async def _score_user(user_id, rows: list, match_engine: MatchEngine, run_id=None, index=None) -> int:
+    """
+    Run one user's jobs through the engine in its own session so a slow user never blocks the others.
+    `index` is the user's MatchIndex when it is shared across pages. With `run_id`, the user's
+    checkpoint is marked done in the same commit. Returns the matches created.
+    """
     from core.database import AsyncSessionLocal
-    from sqlalchemy import select, and_
-    from apps.ever_apply.models import Job, JobMatch, User
-    from apps.ever_apply.services.scraper import fetch_indeed_jobs
-    from apps.ever_apply.services.scoring import score_match
+    from apps.ever_apply.models import User
+    from apps.ever_apply.services.runs import mark_done
+
+    async with AsyncSessionLocal() as db:
+        user = await db.get(User, user_id)
+        matches_created = await match_engine.match_user(db, UserContext.from_user(user), rows, index=index)
+
+        if run_id is not None:
+            # Matches and the user's checkpoint commit together — a crash either keeps both or neither
+            await mark_done(db, run_id, user.id, matches_created)
+        await db.commit()
+    return matches_created
+
+
+async def fetch_and_score(stats: RunStats | None = None) -> dict | None:
+    """Fetch new jobs from Indeed and score them — one Apify call per distinct search profile.
+
+    Users with the same normalized (keywords, location, remote) share one actor call. The
+    configured Greenhouse/Lever boards are downloaded once per run, concurrently with the
+    searches, and merged into every search's batch. Searches
+    and users run concurrently (EVER_APPLY_USER_CONCURRENCY), each user in its own session, and
+    all DeepSeek calls share one EVER_APPLY_SCORING_CONCURRENCY limit.
+
+    Each search's dataset is streamed a page at a time: every page is upserted, appended to the
+    group's checkpoints in everapply_run_users, and scored for the group's users while the next
+    one downloads. Each user's existing matches are indexed once per run and shared by all its
+    pages. Once the whole search is in, the group is marked fetched, without waiting for its
+    scoring. If a run is interrupted, the next call resumes it:
+    finished users are skipped, users whose jobs were already fetched are scored from the
+    stored job ids, and a search cut off mid-stream is fetched again (pages that were already
+    scored are skipped by the engine's dedup).
+    Pass `stats` to watch the counters while the run is in progress. Returns the run's stats.
+    """
+    from core.database import AsyncSessionLocal
+    from sqlalchemy import select
+    from apps.ever_apply.models import RunUserStatus, User
+    from apps.ever_apply.services.planner import apify_savings, plan_searches
+    from apps.ever_apply.services.dedup import MatchIndex
+    from apps.ever_apply.services.runs import finish_run, mark_done, mark_fetched, start_run
+    from apps.ever_apply.services.scraper import fetch_board_jobs
+    from apps.ever_apply.services.usage import usage_context
 
     logger.info("fetch_and_score: starting")
+    stats = stats or RunStats()
     try:
         async with AsyncSessionLocal() as db:
             users_result = await db.execute(
                 select(User).where(User.parsed_data.isnot(None))
             )
             users = users_result.scalars().all()
-            if not users:
-                logger.info("fetch_and_score: no users with resumes, skipping Apify call")
-                return
+        if not users:
+            logger.info("fetch_and_score: no users with resumes, skipping Apify call")
+            return None
+
+        eligible = []
+        for user in users:
+            if not user.scraping_enabled:
+                logger.info(f"fetch_and_score: skipping user {user.id} — scraping disabled")
+                continue
+            if not _is_eligible(user):
+                logger.info(f"fetch_and_score: skipping user {user.id} — trial expired")
+                continue
+            eligible.append(user)
 
-            total_jobs = 0
-            matched = 0
-            for user in users:
-                if not user.scraping_enabled:
-                    logger.info(f"fetch_and_score: skipping user {user.id} — scraping disabled")
-                    continue
-                if not _is_eligible(user):
-                    logger.info(f"fetch_and_score: skipping user {user.id} — trial expired")
-                    continue
-
-                # User-specific keywords from their parsed titles
-                keywords = list(dict.fromkeys(user.parsed_data.get("titles", [])))[:5] or ["software engineer", "developer"]
-
-                # Location: only pass it for onsite/hybrid users
-                prefs = user.preferences or {}
-                remote_pref = prefs.get("remote_type")
-                location = prefs.get("preferred_location", "") if remote_pref in ("onsite", "hybrid") else ""
-
-                logger.info(f"fetch_and_score: fetching for user {user.id} — keywords={keywords}, location={location!r}")
-                jobs = await fetch_indeed_jobs(keywords, location, remote=remote_pref == "remote")
-                total_jobs += len(jobs)
-
-                for job_data in jobs:
-                    if not job_data.get("source_url"):
-                        continue
-
-                    existing = await db.execute(
-                        select(Job).where(Job.source_url == job_data["source_url"])
-                    )
-                    job = existing.scalar_one_or_none()
-                    if not job:
-                        job = Job(**{k: v for k, v in job_data.items() if k != "raw_json"}, raw_json=job_data.get("raw_json"))
-                        db.add(job)
-                        await db.flush()
-
-                    summary = user.parsed_data.get("summary", "")
-                    skills = ", ".join(user.parsed_data.get("skills", []))
-                    resume_context = f"Summary: {summary}\nSkills: {skills}"
-                    description = job_data.get("description", "")
-                    if not summary or not description:
-                        continue
-
-                    # Remote type filter
-                    if remote_pref and job.remote_type and job.remote_type != remote_pref:
-                        continue
-
-                    # Clearance filter
-                    if prefs.get("exclude_clearance") and _requires_clearance(description):
-                        continue
-
-                    # Skip if already matched by job ID
-                    existing_match = await db.execute(
-                        select(JobMatch).where(
-                            and_(JobMatch.user_id == user.id, JobMatch.job_id == job.id)
-                        )
-                    )
-                    if existing_match.scalar_one_or_none() is not None:
-                        continue
-
-                    # Skip if already matched a job with same title + company (different URL)
-                    existing_title_match = await db.execute(
-                        select(JobMatch)
-                        .join(Job)
-                        .where(
-                            and_(
-                                JobMatch.user_id == user.id,
-                                Job.title == job_data["title"],
-                                Job.company == job_data["company"],
-                            )
-                        )
-                    )
-                    if existing_title_match.scalar_one_or_none() is not None:
-                        continue
-
-                    result = await score_match(resume_context, description, user_preferences=prefs)
-                    score = result.get("score", 0)
-                    reason = result.get("reason", "")
-
-                    db.add(JobMatch(user_id=user.id, job_id=job.id, score=score, reason=reason))
-                    matched += 1
+        async with AsyncSessionLocal() as db:
+            run, checkpoints = await start_run(db, "fetch_and_score", [user.id for user in eligible])
+        stats.run_id = run.id
+
+        pending = [user for user in eligible if checkpoints[user.id].status == RunUserStatus.PENDING]
+        fetched = [user for user in eligible if checkpoints[user.id].status == RunUserStatus.FETCHED]
+        skipped = len(eligible) - len(pending) - len(fetched)
+        if fetched or skipped:
+            logger.info(
+                f"fetch_and_score: resuming run {run.id} — {skipped} user(s) already done, "
+                f"{len(fetched)} already fetched, {len(pending)} pending"
+            )
 
-            await db.commit()
-            logger.info(f"fetch_and_score: done — {total_jobs} jobs fetched, {matched} new matches created")
+        groups = plan_searches(pending)
+        logger.info(f"fetch_and_score: {len(groups)} Apify search(es) planned for {len(pending)} user(s)")
+
+        user_sem = asyncio.Semaphore(settings.EVER_APPLY_USER_CONCURRENCY)
+        match_engine = MatchEngine(stats, score_limiter=asyncio.Semaphore(settings.EVER_APPLY_SCORING_CONCURRENCY))
+        results_per_group = []
+
+        async def _run_user(user_id, rows, run_id=None, index=None) -> int | None:
+            """Score under the user limit; None if the user failed."""
+            async with user_sem:
+                try:
+                    return await _score_user(user_id, rows, match_engine, run_id, index)
+                except Exception:
+                    stats.errors += 1
+                    logger.exception(f"fetch_and_score: user {user_id} failed")
+                    return None
+
+        async def _run_group(group):
+            scoring = []
+            indeed_results = 0
+            search_failed = False
+            # One index per user for the whole run — every page's dedup checks and extends the same one
+            async with AsyncSessionLocal() as db:
+                indexes = {user_id: await MatchIndex.load(db, user_id) for user_id in group.user_ids}
+            async with asyncio.TaskGroup() as pages:
+                try:
+                    async for rows, indeed_count in _fetch_group(group, match_engine, board_jobs, run.id):
+                        indeed_results += indeed_count
+                        # Score this page for every user in the group while the next one downloads
+                        scoring += [
+                            (user_id, pages.create_task(_run_user(user_id, rows, index=indexes[user_id])))
+                            for user_id in group.user_ids
+                        ]
+                    # The whole search is in and checkpointed — a crash from here on re-scores, never re-fetches
+                    async with AsyncSessionLocal() as db:
+                        await mark_fetched(db, run.id, group.user_ids)
+                        await db.commit()
+                except Exception:
+                    # Pages already scored keep their matches; the users stay PENDING and are re-fetched on retry
+                    stats.errors += 1
+                    search_failed = True
+                    logger.exception(f"fetch_and_score: search failed for users {group.user_ids}")
+            if search_failed:
+                return
+            results_per_group.append((group, indeed_results))
+
+            matches = dict.fromkeys(group.user_ids, 0)
+            failed = set()
+            for user_id, task in scoring:
+                if task.result() is None:
+                    failed.add(user_id)
+                else:
+                    matches[user_id] += task.result()
+            # Close out users whose every page scored — a user with a failed page stays FETCHED
+            # and is re-scored on resume
+            async with AsyncSessionLocal() as db:
+                for user_id in group.user_ids:
+                    if user_id not in failed:
+                        await mark_done(db, run.id, user_id, matches[user_id])
+                await db.commit()
+            stats.users += len(group.user_ids) - len(failed)
+
+        async def _resume_user(user_id):
+            async with AsyncSessionLocal() as db:
+                rows = await match_engine.load_rows(db, checkpoints[user_id].job_ids or [])
+            if await _run_user(user_id, rows, run.id) is not None:
+                stats.users += 1
+
+        # Every DeepSeek/Apify call from here on — the tasks below copy the tags — is metered against this run
+        with usage_context(run_id=run.id):
+            # Boards are free and user-independent — one concurrent download shared by every search
+            board_jobs = asyncio.create_task(fetch_board_jobs()) if groups else None
+            await asyncio.gather(
+                *(_run_group(group) for group in groups),
+                *(_resume_user(user.id) for user in fetched),
+            )
+        stats.apify_results_saved, stats.apify_usd_saved = apify_savings(results_per_group)
+
+        summary = stats.summary()
+        async with AsyncSessionLocal() as db:
+            await finish_run(db, run.id, summary)
+        logger.info(
+            f"fetch_and_score: done — {summary['jobs_fetched']} jobs fetched in {summary['apify_calls']} Apify calls "
+            f"(saved {summary['apify_results_saved']} results, ${summary['apify_usd_saved']:.2f}), "
+            f"{summary['matches']} new matches created, "
+            f"prefilter removed {summary['prefilter_rejected']} LLM calls ({summary['prefilter_rate']:.0%}), "
+            f"{summary['llm_calls']} LLM calls ({summary['score_cache_hits']} cache hits / {summary['score_cache_misses']} misses) in {summary['elapsed_s']}s ({summary['llm_calls_per_s']}/s), "
+            f"DeepSeek prompt cache hit rate {summary['prompt_cache_hit_rate']:.0%}, "
+            f"{summary['errors']} errors"
+        )
+        _log_stages("fetch_and_score", summary)
+        return summary
     except Exception:
+        # Re-raised so the task is retried — the retry resumes this run from its checkpoints,
+        # and once no retry is left the worker marks the run FAILED
         logger.exception("fetch_and_score failed")
+        raise
+
+
+async def score_existing_jobs(stats: RunStats | None = None) -> dict:
+    """Score jobs already in the DB against all eligible users — no Apify call. Returns the run's stats."""
+    from core.database import AsyncSessionLocal
+    from sqlalchemy import select
+    from apps.ever_apply.models import User
+
+    stats = stats or RunStats()
+    match_engine = MatchEngine(stats, score_limiter=asyncio.Semaphore(settings.EVER_APPLY_SCORING_CONCURRENCY))
+    async with AsyncSessionLocal() as db:
+        users_result = await db.execute(
+            select(User).where(User.parsed_data.isnot(None))
+        )
+        users = users_result.scalars().all()
+        if not users:
+            return {"jobs_scored": 0, "matches_created": 0, "reason": "no users with resumes"}
+
+        for user in users:
+            if not user.scraping_enabled:
+                continue
+            if not _is_eligible(user):
+                continue
+
+            ctx = UserContext.from_user(user)
+            if not ctx.summary:
+                continue
+            # Only jobs not already matched for this user — avoids redundant DeepSeek calls
+            rows = await match_engine.load_unmatched(db, ctx)
+            await match_engine.match_user(db, ctx, rows)
+            stats.users += 1
+
+        await db.commit()
+
+    summary = stats.summary()
+    logger.info(
+        f"score_existing_jobs: {summary['matches']} matches created, {summary['llm_calls']} LLM calls, "
+        f"DeepSeek prompt cache hit rate {summary['prompt_cache_hit_rate']:.0%}"
+    )
+    _log_stages("score_existing_jobs", summary)
+    return summary
+
+
+def _log_stages(name: str, summary: dict) -> None:
+    """One line of per-stage timings/counters, e.g. `score 12.40s 120→118`."""
+    stages = ", ".join(
+        f"{stage} {m['seconds']:.2f}s {m['in']}→{m['out']}" for stage, m in summary["stages"].items() if m["calls"]
+    )
+    logger.info(f"{name}: stages — {stages}")
+
+
+async def resume_interrupted_run():
+    """When elected leader, re-queue a fetch_and_score run a crash, redeploy or dead leader left RUNNING."""
+    from core.database import AsyncSessionLocal
+    from sqlalchemy import select
+    from apps.ever_apply.models import Run, RunStatus
+
+    resume_cutoff = datetime.utcnow() - timedelta(hours=settings.EVER_APPLY_RUN_RESUME_HOURS)
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(
+            select(Run.id).where(
+                Run.kind == "fetch_and_score",
+                Run.status == RunStatus.RUNNING,
+                Run.started_at >= resume_cutoff,
+            )
+        )
+        run_id = result.scalars().first()
+    if run_id:
+        # If its task is still RUNNING this is a no-op — workers reclaim it once its heartbeat goes stale
+        logger.info(f"resume_interrupted_run: re-queueing fetch_and_score run {run_id}")
+        await _enqueue("fetch_and_score")()
 
 
 MT = "America/Denver"
 
 # Weekdays — cleanup before fetch, then fetch + score twice a day
-scheduler.add_job(cleanup_job, CronTrigger(day_of_week="mon-fri", hour=8, minute=55, timezone=MT))
-scheduler.add_job(fetch_and_score, CronTrigger(day_of_week="mon-fri", hour=9, minute=0, timezone=MT))
-scheduler.add_job(fetch_and_score, CronTrigger(day_of_week="mon-fri", hour=12, minute=0, timezone=MT))
+scheduler.add_job(_leader_only(_enqueue("cleanup_jobs")), CronTrigger(day_of_week="mon-fri", hour=8, minute=55, timezone=MT))
+scheduler.add_job(_leader_only(_enqueue("fetch_and_score")), CronTrigger(day_of_week="mon-fri", hour=9, minute=0, timezone=MT))
+scheduler.add_job(_leader_only(_enqueue("fetch_and_score")), CronTrigger(day_of_week="mon-fri", hour=12, minute=0, timezone=MT))
 
 # Weekends — cleanup + single fetch (conserve Apify credits)
-scheduler.add_job(cleanup_job, CronTrigger(day_of_week="sat,sun", hour=8, minute=55, timezone=MT))
-scheduler.add_job(fetch_and_score, CronTrigger(day_of_week="sat,sun", hour=9, minute=0, timezone=MT))
+scheduler.add_job(_leader_only(_enqueue("cleanup_jobs")), CronTrigger(day_of_week="sat,sun", hour=8, minute=55, timezone=MT))
+scheduler.add_job(_leader_only(_enqueue("fetch_and_score")), CronTrigger(day_of_week="sat,sun", hour=9, minute=0, timezone=MT))
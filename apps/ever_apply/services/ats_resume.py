@@ -1,10 +1,8 @@
 import json
 import fitz
-import boto3
 from botocore.exceptions import ClientError
 from io import BytesIO
 from urllib.parse import urlparse
-from openai import AsyncOpenAI
 from fastapi import HTTPException
 from reportlab.lib.pagesizes import letter
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
@@ -15,25 +13,15 @@ from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, HRFlowable
 from reportlab.platypus.flowables import KeepInFrame
 
 from core.config import settings
-
-deepseek = AsyncOpenAI(api_key=settings.DEEPSEEK_API_KEY, base_url=settings.DEEPSEEK_BASE_URL)
-
-
-def _r2_client():
-    return boto3.client(
-        "s3",
-        endpoint_url=f"https://{settings.R2_ACCOUNT_ID}.r2.cloudflarestorage.com",
-        aws_access_key_id=settings.R2_ACCESS_KEY_ID,
-        aws_secret_access_key=settings.R2_SECRET_ACCESS_KEY,
-        region_name="auto",
-    )
+from apps.ever_apply.services.llm import chat_completion
+from apps.ever_apply.services.storage import r2_client
 
 
 async def download_resume_text(resume_url: str) -> str:
     """Download user's PDF from R2 and extract full text."""
     key = urlparse(resume_url).path.lstrip("/")
     try:
-        response = _r2_client().get_object(Bucket=settings.R2_BUCKET_NAME, Key=key)
+        response = r2_client().get_object(Bucket=settings.R2_BUCKET_NAME, Key=key)
     except ClientError as e:
         if e.response["Error"]["Code"] == "NoSuchKey":
             raise HTTPException(status_code=404, detail="Resume file not found. Please re-upload your resume.")
@@ -45,7 +33,8 @@ async def download_resume_text(resume_url: str) -> str:
 
 async def generate_ats_content(resume_text: str, job_description: str) -> dict:
     """Call DeepSeek to produce an ATS-optimized resume as structured JSON."""
-    response = await deepseek.chat.completions.create(
+    response = await chat_completion(
+        feature="ats",
         model="deepseek-chat",
         response_format={"type": "json_object"},
         messages=[
@@ -192,7 +181,8 @@ def build_pdf(data: dict) -> bytes:
 
 async def generate_ideal_content(job_description: str) -> dict:
     """Call DeepSeek to produce a fictional ideal candidate resume as structured JSON."""
-    response = await deepseek.chat.completions.create(
+    response = await chat_completion(
+        feature="ideal",
         model="deepseek-chat",
         response_format={"type": "json_object"},
         messages=[
@@ -250,7 +240,8 @@ certifications may be an empty list if none exist.""",
 
 async def generate_realistic_content(resume_text: str, job_description: str) -> dict:
     """Call DeepSeek to produce an enhanced resume using real skeleton + AI-generated bullets/skills/summary."""
-    response = await deepseek.chat.completions.create(
+    response = await chat_completion(
+        feature="realistic",
         model="deepseek-chat",
         response_format={"type": "json_object"},
         messages=[
@@ -311,16 +302,10 @@ async def upload_ats_resume(pdf_bytes: bytes, clerk_user_id: str, match_id: str)
     """Upload the generated ATS resume PDF to R2 and return its public URL."""
     prefix = "development/ats-resumes" if settings.ENV == "development" else "ats-resumes"
     key = f"{prefix}/{clerk_user_id}/{match_id}.pdf"
-    _r2_client().put_object(
+    r2_client().put_object(
         Bucket=settings.R2_BUCKET_NAME,
         Key=key,
         Body=pdf_bytes,
         ContentType="application/pdf",
     )
     return f"{settings.R2_PUBLIC_URL}/{key}"
-
-
-async def delete_ats_resume(ats_resume_url: str) -> None:
-    """Delete an ATS resume PDF from R2."""
-    key = urlparse(ats_resume_url).path.lstrip("/")
-    _r2_client().delete_object(Bucket=settings.R2_BUCKET_NAME, Key=key)
@@ -0,0 +1,40 @@
+import hashlib
+import json
+from datetime import datetime
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from apps.ever_apply.models import BoardCache
+
+
+def posting_hash(raw: dict) -> str:
+    """Content hash of one raw board posting — any edit (title, description, updated_at, ...) changes it."""
+    payload = json.dumps(raw, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:32]
+
+
+async def load_board_cache(db: AsyncSession, urls: list[str]) -> dict[str, BoardCache]:
+    """One query for every board URL — returns {url: BoardCache} for boards fetched before."""
+    if not urls:
+        return {}
+    result = await db.execute(select(BoardCache).where(BoardCache.url.in_(urls)))
+    return {entry.url: entry for entry in result.scalars()}
+
+
+async def store_board_cache(db: AsyncSession, entries: list[dict]) -> None:
+    """Upsert {url, etag, last_modified, posting_hashes} per board. Caller commits."""
+    if not entries:
+        return
+    now = datetime.utcnow()
+    stmt = insert(BoardCache).values([{**entry, "fetched_at": now} for entry in entries])
+    await db.execute(
+        stmt.on_conflict_do_update(
+            index_elements=[BoardCache.url],
+            set_={
+                "etag": stmt.excluded.etag,
+                "last_modified": stmt.excluded.last_modified,
+                "posting_hashes": stmt.excluded.posting_hashes,
+                "fetched_at": stmt.excluded.fetched_at,
+            },
+        )
+    )
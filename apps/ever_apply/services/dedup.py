@@ -0,0 +1,52 @@
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from apps.ever_apply.models import Job, JobMatch
+
+
+def title_company_key(title: str | None, company: str | None) -> tuple[str, str]:
+    """Normalized (title, company) pair — same lowercase/strip rule the Indeed batch dedup uses."""
+    return ((title or "").lower().strip(), (company or "").lower().strip())
+
+
+class MatchIndex:
+    """
+    Set-based index of one user's existing matches, loaded once per run.
+    Rejects a candidate job in O(1) if the user already has a match on the same job id,
+    on any job in the same near-duplicate cluster (same canonical job — see services/minhash.py),
+    or on a job with the same normalized title + company (a repost under a different URL).
+    A near-duplicate is never scored again: the match the user already has stands for it.
+    Call add() as new matches are created so later candidates in the same run see them.
+    """
+
+    def __init__(self) -> None:
+        self.job_ids: set = set()  # Matched job ids plus their canonical ids
+        self.title_companies: set[tuple[str, str]] = set()
+
+    @classmethod
+    async def load(cls, db: AsyncSession, user_id) -> "MatchIndex":
+        result = await db.execute(
+            select(JobMatch.job_id, Job.canonical_job_id, Job.title, Job.company)
+            .join(Job, JobMatch.job_id == Job.id)
+            .where(JobMatch.user_id == user_id)
+        )
+        index = cls()
+        for job_id, canonical_job_id, title, company in result:
+            index.job_ids.add(job_id)
+            if canonical_job_id is not None:
+                index.job_ids.add(canonical_job_id)
+            index.title_companies.add(title_company_key(title, company))
+        return index
+
+    def seen(self, job) -> bool:
+        """`job` is anything with id, canonical_job_id, title and company — a Job or an upsert_jobs row."""
+        return (
+            job.id in self.job_ids
+            or (job.canonical_job_id is not None and job.canonical_job_id in self.job_ids)
+            or title_company_key(job.title, job.company) in self.title_companies
+        )
+
+    def add(self, job) -> None:
+        self.job_ids.add(job.id)
+        if job.canonical_job_id is not None:
+            self.job_ids.add(job.canonical_job_id)
+        self.title_companies.add(title_company_key(job.title, job.company))
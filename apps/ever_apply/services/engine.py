@@ -0,0 +1,286 @@
+import asyncio
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from sqlalchemy.ext.asyncio import AsyncSession
+from core.config import settings
+from apps.ever_apply.models import JobMatch
+from apps.ever_apply.services.dedup import MatchIndex
+from apps.ever_apply.services.llm import USAGE_FIELDS, cache_hit_rate
+from apps.ever_apply.services.ingest import load_job_rows, load_unmatched_job_rows, upsert_jobs
+from apps.ever_apply.services.prefilter import PREFILTER_REASON, prefilter, required_tokens
+from apps.ever_apply.services.score_cache import score_with_cache
+from apps.ever_apply.services.scoring import score_descriptions
+from apps.ever_apply.services.usage import usage_context
+
+# Stage names reported in every run's stats, in pipeline order — custom stages are added as they run
+STAGES = ("ingest", "filter", "dedup", "prefilter", "score", "persist")
+
+
+@dataclass
+class StageMetrics:
+    """Counters for one pipeline stage, summed over every user in a run."""
+    calls: int = 0
+    items_in: int = 0
+    items_out: int = 0
+    seconds: float = 0.0  # Cumulative — users overlap, so this can exceed the run's wall time
+
+
+@dataclass
+class RunStats:
+    """Throughput counters for a single task run — published live as the task's progress."""
+    users: int = 0
+    jobs_fetched: int = 0
+    apify_calls: int = 0
+    apify_results_saved: int = 0
+    apify_usd_saved: float = 0.0
+    llm_calls: int = 0
+    prefilter_rejected: int = 0
+    prefilter_considered: int = 0
+    score_cache_hits: int = 0
+    score_cache_misses: int = 0
+    matches: int = 0
+    errors: int = 0
+    started_at: float = field(default_factory=time.monotonic)
+    run_id: object = None  # everapply_runs id, once fetch_and_score has started or resumed its run
+    stages: dict[str, StageMetrics] = field(default_factory=lambda: {name: StageMetrics() for name in STAGES})
+    llm_usage: dict[str, int] = field(default_factory=dict)  # DeepSeek token totals, incl. prompt cache hits/misses
+
+    def summary(self) -> dict:
+        elapsed = time.monotonic() - self.started_at
+        return {
+            "users": self.users,
+            "jobs_fetched": self.jobs_fetched,
+            "apify_calls": self.apify_calls,
+            "apify_results_saved": self.apify_results_saved,
+            "apify_usd_saved": round(self.apify_usd_saved, 4),
+            "llm_calls": self.llm_calls,
+            "prefilter_rejected": self.prefilter_rejected,
+            "prefilter_rate": round(self.prefilter_rejected / self.prefilter_considered, 3) if self.prefilter_considered else 0.0,
+            "score_cache_hits": self.score_cache_hits,
+            "score_cache_misses": self.score_cache_misses,
+            "matches": self.matches,
+            "errors": self.errors,
+            "elapsed_s": round(elapsed, 2),
+            "llm_calls_per_s": round(self.llm_calls / elapsed, 2) if elapsed > 0 else 0.0,
+            "llm_usage": {name: self.llm_usage.get(name, 0) for name in USAGE_FIELDS},
+            "prompt_cache_hit_rate": cache_hit_rate(self.llm_usage),
+            "stages": {
+                name: {"calls": m.calls, "in": m.items_in, "out": m.items_out, "seconds": round(m.seconds, 3)}
+                for name, m in self.stages.items()
+            },
+        }
+
+
+@dataclass
+class UserContext:
+    """Everything the filters and scorer read about one user, computed once per run."""
+    user_id: object
+    parsed_data: dict
+    prefs: dict
+    summary: str
+    resume_context: str
+
+    @classmethod
+    def from_user(cls, user) -> "UserContext":
+        parsed_data = user.parsed_data or {}
+        summary = parsed_data.get("summary", "")
+        skills = ", ".join(parsed_data.get("skills", []))
+        return cls(
+            user_id=user.id,
+            parsed_data=parsed_data,
+            prefs=user.preferences or {},
+            summary=summary,
+            resume_context=f"Summary: {summary}\nSkills: {skills}",
+        )
+
+
+# --- Filter stage — each filter returns True to keep the job ---
+# Job-side facts are the feature columns computed at ingest (services/features.py)
+
+def has_description(ctx: UserContext, job) -> bool:
+    return bool(ctx.summary and job.description_length)
+
+
+def remote_type_matches(ctx: UserContext, job) -> bool:
+    remote_pref = ctx.prefs.get("remote_type")
+    return not (remote_pref and job.remote_type and job.remote_type != remote_pref)
+
+
+def location_matches(ctx: UserContext, job) -> bool:
+    """For onsite/hybrid, the preferred city must appear in the job's location (unknown locations pass)."""
+    preferred_location = ctx.prefs.get("preferred_location")
+    if ctx.prefs.get("remote_type") in ("onsite", "hybrid") and preferred_location and job.location:
+        city = preferred_location.split(",")[0].strip().lower()
+        return city in job.location.lower()
+    return True
+
+
+def clearance_allowed(ctx: UserContext, job) -> bool:
+    return not (ctx.prefs.get("exclude_clearance") and job.requires_clearance)
+
+
+DEFAULT_FILTERS = (has_description, remote_type_matches, location_matches, clearance_allowed)
+
+
+@dataclass
+class MatchBatch:
+    """One user's jobs as they move through the per-user stages."""
+    rows: list                      # Job rows still in play — filter narrows this
+    index: MatchIndex | None = None  # The user's existing matches; dedup loads it if the caller didn't
+    candidates: list = field(default_factory=list)  # (job, description) pairs headed for scoring
+    results: list = field(default_factory=list)     # (job, {score, reason}) pairs to persist
+
+
+# --- Per-user stages — each is `async (engine, db, ctx, batch, counts)`, moves the batch along
+# and sets counts["in"] / counts["out"] for its StageMetrics ---
+
+async def filter_stage(engine: "MatchEngine", db: AsyncSession, ctx: UserContext, batch: MatchBatch, counts: dict) -> None:
+    counts["in"] = len(batch.rows)
+    batch.rows = [job for job in batch.rows if all(keep(ctx, job) for keep in engine.filters)]
+    counts["out"] = len(batch.rows)
+
+
+async def dedup_stage(engine: "MatchEngine", db: AsyncSession, ctx: UserContext, batch: MatchBatch, counts: dict) -> None:
+    """Skip jobs already matched by id, near-duplicate cluster or title + company."""
+    counts["in"] = len(batch.rows)
+    if batch.index is None:
+        batch.index = await MatchIndex.load(db, ctx.user_id)
+    for job in batch.rows:
+        if batch.index.seen(job):
+            continue
+        # Matches are only written after scoring, so index the candidate now
+        batch.index.add(job)
+        batch.candidates.append((job, job.description))
+    counts["out"] = len(batch.candidates)
+
+
+async def prefilter_stage(engine: "MatchEngine", db: AsyncSession, ctx: UserContext, batch: MatchBatch, counts: dict) -> None:
+    """Local skill-overlap check — hopeless jobs get a zero score without a DeepSeek call."""
+    counts["in"] = len(batch.candidates)
+    engine.stats.prefilter_considered += len(batch.candidates)
+    batch.candidates, rejected = prefilter(ctx.parsed_data, batch.candidates, settings.EVER_APPLY_PREFILTER_MIN_OVERLAP)
+    engine.stats.prefilter_rejected += len(rejected)
+    batch.results += [(job, {"score": 0, "reason": PREFILTER_REASON}) for job, _ in rejected]
+    counts["out"] = len(batch.candidates)
+
+
+async def score_stage(engine: "MatchEngine", db: AsyncSession, ctx: UserContext, batch: MatchBatch, counts: dict) -> None:
+    counts["in"] = len(batch.candidates)
+    stats = engine.stats
+
+    async def _score(descriptions):
+        results, calls, errors = await score_descriptions(
+            ctx.resume_context, descriptions, ctx.prefs, limiter=engine.score_limiter, usage=stats.llm_usage
+        )
+        stats.llm_calls += calls
+        stats.errors += errors
+        return results
+
+    with usage_context(user_id=ctx.user_id):
+        # Cached scores are looked up for the whole batch before any DeepSeek call
+        scored, hits, misses = await score_with_cache(db, ctx.resume_context, batch.candidates, ctx.prefs, _score)
+    stats.score_cache_hits += hits
+    stats.score_cache_misses += misses
+    batch.results += scored
+    batch.candidates = []
+    counts["out"] = len(scored)
+
+
+async def persist_stage(engine: "MatchEngine", db: AsyncSession, ctx: UserContext, batch: MatchBatch, counts: dict) -> None:
+    """Add a JobMatch per result — the caller commits."""
+    counts["in"] = counts["out"] = len(batch.results)
+    for job, result in batch.results:
+        db.add(JobMatch(user_id=ctx.user_id, job_id=job.id, score=result.get("score", 0), reason=result.get("reason", "")))
+    engine.stats.matches += len(batch.results)
+
+
+DEFAULT_STAGES = (
+    ("filter", filter_stage),
+    ("dedup", dedup_stage),
+    ("prefilter", prefilter_stage),
+    ("score", score_stage),
+    ("persist", persist_stage),
+)
+
+
+class MatchEngine:
+    """
+    The one match-generation pipeline behind fetch_and_score and score-jobs:
+
+        ingest → filter → dedup → prefilter → score → persist
+
+    Ingest is shared per batch (upsert scraped jobs, or load stored ones); match_user
+    runs the per-user `stages` — DEFAULT_STAGES unless the caller composes its own
+    (name, stage) sequence, as it can with `filters`. Every stage is timed and counted
+    into stats.stages, so pipeline work is measured in one place.
+    """
+
+    def __init__(
+        self,
+        stats: RunStats,
+        score_limiter: asyncio.Semaphore | None = None,
+        filters=DEFAULT_FILTERS,
+        stages=DEFAULT_STAGES,
+    ) -> None:
+        self.stats = stats
+        self.score_limiter = score_limiter
+        self.filters = filters
+        self.stages = stages
+
+    @contextmanager
+    def _stage(self, name: str, items_in: int):
+        """Time a stage; the body sets `result["out"]` (and `result["in"]` if unknown up front)."""
+        metrics = self.stats.stages.setdefault(name, StageMetrics())
+        result = {"in": items_in, "out": items_in}
+        start = time.perf_counter()
+        try:
+            yield result
+        finally:
+            metrics.calls += 1
+            metrics.items_in += result["in"]
+            metrics.items_out += result["out"]
+            metrics.seconds += time.perf_counter() - start
+
+    # --- Ingest ---
+
+    async def ingest(self, db: AsyncSession, jobs: list[dict]) -> list:
+        """Upsert a scraped batch; returns its job rows. Caller commits."""
+        with self._stage("ingest", len(jobs)) as stage:
+            rows = await upsert_jobs(db, jobs)
+            stage["out"] = len(rows)
+        return rows
+
+    async def load_rows(self, db: AsyncSession, job_ids: list) -> list:
+        """Re-load rows a run checkpoint already fetched."""
+        with self._stage("ingest", len(job_ids)) as stage:
+            rows = await load_job_rows(db, job_ids)
+            stage["out"] = len(rows)
+        return rows
+
+    async def load_unmatched(self, db: AsyncSession, ctx: UserContext) -> list:
+        """
+        Stored jobs this user has no match for yet, narrowed in SQL by the same preferences — and,
+        with the prefilter on, to jobs sharing a token with the resume (the rest could only be rejected).
+        """
+        tokens = required_tokens(ctx.parsed_data) if settings.EVER_APPLY_PREFILTER_MIN_OVERLAP > 0 else None
+        with self._stage("ingest", 0) as stage:
+            rows = await load_unmatched_job_rows(db, ctx.user_id, ctx.prefs, tokens)
+            stage["in"] = stage["out"] = len(rows)
+        return rows
+
+    # --- Per-user stages ---
+
+    async def match_user(self, db: AsyncSession, ctx: UserContext, rows: list, index: MatchIndex | None = None) -> int:
+        """
+        Run one user's rows — the whole set, or one page of a streamed search — through
+        self.stages. Pass the user's `index` to share one MatchIndex across pages; without it
+        dedup loads a fresh one. Matches are added to `db` but not committed — the caller
+        commits them with its checkpoint, and counts the user once they're done.
+        Returns the number of matches created.
+        """
+        batch = MatchBatch(rows=list(rows), index=index)
+        for name, run_stage in self.stages:
+            with self._stage(name, 0) as counts:
+                await run_stage(self, db, ctx, batch, counts)
+        return len(batch.results)
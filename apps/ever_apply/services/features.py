@@ -0,0 +1,45 @@
+"""
+Job-side facts the per-user filters read, computed once per job at ingest and stored on
+everapply_jobs — so filtering a user's candidates is a SQL predicate or a column read,
+not a string scan of every description for every user.
+"""
+
+import re
+from apps.ever_apply.models import Seniority
+from apps.ever_apply.services.keywords import requires_clearance
+from apps.ever_apply.services.prefilter import description_tokens
+
+# Checked in order against the title — "Senior Associate" is senior, "Associate Engineer" junior
+_SENIORITY_PATTERNS = [
+    (Seniority.SENIOR, re.compile(r"\b(senior|sr|lead|staff|principal|head|director)\b")),
+    (Seniority.JUNIOR, re.compile(r"\b(junior|jr|entry[- ]level|associate|intern|internship|graduate|new grad)\b")),
+    (Seniority.MID, re.compile(r"\b(mid[- ]level|intermediate)\b")),
+]
+
+
+def seniority_hint(title: str) -> Seniority | None:
+    """Seniority the title states outright, or None when it doesn't say."""
+    title = title.lower()
+    for seniority, pattern in _SENIORITY_PATTERNS:
+        if pattern.search(title):
+            return seniority
+    return None
+
+
+def job_features(title: str | None, description: str | None, keyword_families: set[str] | None = None) -> dict:
+    """
+    The feature columns for one job — clearance flag, seniority hint, description tokens, description length.
+    `keyword_families` is the description's keywords.classify() hits when the scraper already
+    has them; without it the description is scanned for clearance keywords here.
+    """
+    description = description or ""
+    if keyword_families is None:
+        clearance = requires_clearance(description)
+    else:
+        clearance = "clearance" in keyword_families
+    return {
+        "requires_clearance": clearance,
+        "seniority_hint": seniority_hint(title or ""),
+        "description_tokens": description_tokens(description),
+        "description_length": len(description),
+    }
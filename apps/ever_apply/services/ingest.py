@@ -0,0 +1,179 @@
+from datetime import datetime, timedelta
+from uuid import UUID
+from sqlalchemy import exists, literal_column, or_, select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from apps.ever_apply.models import Job, JobMatch, RemoteType
+from apps.ever_apply.services.features import job_features
+from apps.ever_apply.services.minhash import NEAR_DUPLICATE_THRESHOLD, lsh_buckets, signature, similarity
+
+# Rows per INSERT — keeps each statement well under Postgres' 32k bind parameter limit
+UPSERT_CHUNK_SIZE = 500
+
+_REMOTE_TYPES = {remote_type.value for remote_type in RemoteType}
+
+# Columns the scoring pipeline reads — every helper here returns rows of this shape
+JOB_ROW_COLUMNS = (
+    Job.id,
+    Job.source_url,
+    Job.title,
+    Job.company,
+    Job.description,
+    Job.location,
+    Job.remote_type,
+    Job.canonical_job_id,
+    Job.requires_clearance,
+    Job.seniority_hint,
+    Job.description_length,
+)
+
+
+def _job_row(job_data: dict) -> dict:
+    """Shape a normalized job dict into an insertable row."""
+    row = dict(job_data)
+    # Scrapers can return free-form workType values — anything outside the enum is stored as unknown
+    remote_type = (row.get("remote_type") or "").lower()
+    row["remote_type"] = remote_type if remote_type in _REMOTE_TYPES else None
+    row["minhash"] = signature(row.get("title"), row.get("description"))
+    row["lsh_buckets"] = lsh_buckets(row["minhash"]) if row["minhash"] else None
+    # The scraper's keyword hits feed job_features — they aren't a column
+    row.update(job_features(row.get("title"), row.get("description"), row.pop("keyword_families", None)))
+    return row
+
+
+async def upsert_jobs(db: AsyncSession, jobs: list[dict]) -> list:
+    """
+    Upsert a scraped batch into everapply_jobs keyed on source_url — one statement per chunk.
+    Returns one JOB_ROW_COLUMNS row per unique source_url, whether it was just inserted or already existed.
+    Existing rows are left unchanged; new ones are linked to the job they near-duplicate, if any.
+    The caller owns the transaction.
+    """
+    rows = {}
+    for job_data in jobs:
+        url = job_data.get("source_url")
+        if not url or url in rows:
+            continue
+        rows[url] = _job_row(job_data)
+    if not rows:
+        return []
+
+    # Consistent lock order so concurrent runs upserting overlapping batches can't deadlock
+    ordered = [rows[url] for url in sorted(rows)]
+
+    upserted, inserted = [], []
+    for i in range(0, len(ordered), UPSERT_CHUNK_SIZE):
+        stmt = insert(Job).values(ordered[i:i + UPSERT_CHUNK_SIZE])
+        # No-op update instead of DO NOTHING so RETURNING also yields rows that already existed;
+        # xmax = 0 only on rows this statement inserted
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[Job.source_url],
+            set_={"source_url": stmt.excluded.source_url},
+        ).returning(*JOB_ROW_COLUMNS, literal_column("xmax = 0").label("inserted"))
+        result = await db.execute(stmt)
+        for row in result.all():
+            upserted.append(row)
+            if row.inserted and rows[row.source_url]["minhash"]:
+                inserted.append((row.id, rows[row.source_url]))
+
+    if await link_near_duplicates(db, inserted):
+        # Re-read so the returned rows carry the canonical ids just assigned
+        result = await db.execute(select(*JOB_ROW_COLUMNS).where(Job.id.in_([row.id for row in upserted])))
+        return result.all()
+    return upserted
+
+
+async def link_near_duplicates(db: AsyncSession, inserted: list[tuple]) -> int:
+    """
+    Point each newly inserted job at the earliest job it near-duplicates (a repost under a new
+    title or URL, or the same posting from another source). Candidates come from one GIN-indexed
+    bucket-overlap query and are confirmed by MinHash similarity >= NEAR_DUPLICATE_THRESHOLD.
+    `inserted` is [(job id, row dict with minhash/lsh_buckets)]. Returns the number of jobs linked.
+    """
+    if not inserted:
+        return 0
+    buckets = {bucket for _, row in inserted for bucket in row["lsh_buckets"]}
+    result = await db.execute(
+        select(Job.id, Job.minhash, Job.lsh_buckets, Job.canonical_job_id, Job.created_at)
+        .where(Job.lsh_buckets.overlap(list(buckets)))
+        .order_by(Job.created_at, Job.id)
+    )
+    candidates = result.all()
+    # Earliest first, so a job only ever points at one older than itself — no cycles
+    order = {candidate.id: position for position, candidate in enumerate(candidates)}
+    canonical = {candidate.id: candidate.canonical_job_id for candidate in candidates}
+
+    links = []
+    for job_id, row in sorted(inserted, key=lambda item: order.get(item[0], len(order))):
+        job_buckets = set(row["lsh_buckets"])
+        for candidate in candidates[:order.get(job_id, len(candidates))]:
+            if job_buckets.isdisjoint(candidate.lsh_buckets) or similarity(row["minhash"], candidate.minhash) < NEAR_DUPLICATE_THRESHOLD:
+                continue
+            canonical[job_id] = canonical[candidate.id] or candidate.id
+            links.append({"id": job_id, "canonical_job_id": canonical[job_id]})
+            break
+    if links:
+        await db.execute(update(Job), links)
+    return len(links)
+
+
+async def touch_jobs(db: AsyncSession, source_urls: list[str]) -> list:
+    """
+    Push expires_at 24h out for jobs a source still lists but that were skipped as unchanged,
+    so cleanup keeps them. Returns a JOB_ROW_COLUMNS row for each source_url that still has one. Caller commits.
+    """
+    expires_at = datetime.utcnow() + timedelta(hours=24)
+    rows = []
+    for i in range(0, len(source_urls), UPSERT_CHUNK_SIZE):
+        result = await db.execute(
+            update(Job)
+            .where(Job.source_url.in_(source_urls[i:i + UPSERT_CHUNK_SIZE]))
+            .values(expires_at=expires_at)
+            .returning(*JOB_ROW_COLUMNS)
+            .execution_options(synchronize_session=False)
+        )
+        rows.extend(result.all())
+    return rows
+
+
+async def load_job_rows(db: AsyncSession, job_ids: list) -> list:
+    """Re-load job rows by id in the same shape upsert_jobs returns — used when resuming a run."""
+    if not job_ids:
+        return []
+    # Checkpoints store ids as JSON strings
+    result = await db.execute(select(*JOB_ROW_COLUMNS).where(Job.id.in_([UUID(str(job_id)) for job_id in job_ids])))
+    return result.all()
+
+
+async def load_unmatched_job_rows(
+    db: AsyncSession, user_id, user_preferences: dict | None = None, required_tokens: list[str] | None = None
+) -> list:
+    """
+    Every stored job this user has no match for yet and that passes their remote/location/clearance
+    preferences — one query, filtered in Postgres on the ingest-time feature columns, returning
+    JOB_ROW_COLUMNS only. Jobs with an unknown remote type or location are kept, as in the in-memory filters.
+    `required_tokens` (prefilter.required_tokens) also drops jobs with no possible skill overlap;
+    pass None when the prefilter is off or the resume has no terms (an empty list would match no job).
+    """
+    prefs = user_preferences or {}
+    remote_pref = prefs.get("remote_type")
+
+    stmt = select(*JOB_ROW_COLUMNS).where(
+        Job.description_length > 0,
+        # Anti-join — already-scored jobs never leave the database
+        ~exists().where(JobMatch.user_id == user_id, JobMatch.job_id == Job.id),
+    )
+    if prefs.get("exclude_clearance"):
+        stmt = stmt.where(Job.requires_clearance.is_(False))
+    if required_tokens is not None:
+        stmt = stmt.where(Job.description_tokens.overlap(required_tokens))
+    if remote_pref:
+        stmt = stmt.where(or_(Job.remote_type.is_(None), Job.remote_type == remote_pref))
+
+    # For onsite/hybrid, filter by preferred_location (city/state string match)
+    preferred_location = prefs.get("preferred_location")
+    if remote_pref in ("onsite", "hybrid") and preferred_location:
+        city = preferred_location.split(",")[0].strip()
+        stmt = stmt.where(or_(Job.location.is_(None), Job.location == "", Job.location.icontains(city, autoescape=True)))
+
+    result = await db.execute(stmt)
+    return result.all()
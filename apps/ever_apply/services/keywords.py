@@ -0,0 +1,69 @@
+"""
+Shared keyword matcher for the job-text checks done at scrape and ingest time.
+
+Every keyword family is checked in one call over one lowercased copy of the text:
+
+    found = classify(description)   # {"clearance", "hybrid"}
+
+The scraper classifies each posting's description once and keeps the hits on the job dict
+(`keyword_families`): the remote-type fallback (remote_type_from) and ingest's clearance flag
+both read them.
+
+Keywords that contain another keyword of their family are dropped before scanning ("security
+clearance" can't match where "clearance" doesn't), and a family stops being scanned once one
+of its keywords is found, so each check is at most one C-level substring search. That measured
+faster than a compiled alternation regex, which CPython's `re` tries at every offset — see
+scripts/bench_keywords.py.
+"""
+
+CLEARANCE_KEYWORDS = ["clearance", "ts/sci", "top secret", "dod clearance", "secret clearance", "security clearance"]
+# Phrases that mean fully remote wherever they appear in the title or description
+REMOTE_KEYWORDS = ["remote-first", "fully remote", "100% remote", "work from anywhere", "work from home"]
+HYBRID_KEYWORDS = ["hybrid"]
+
+KEYWORD_FAMILIES = {
+    "clearance": CLEARANCE_KEYWORDS,
+    "remote": REMOTE_KEYWORDS,
+    "hybrid": HYBRID_KEYWORDS,
+}
+
+
+def _minimal(keywords: list[str]) -> list[str]:
+    return [kw for kw in keywords if not any(other != kw and other in kw for other in keywords)]
+
+
+_SCANS = [(family, kw) for family, keywords in KEYWORD_FAMILIES.items() for kw in _minimal(keywords)]
+
+
+def classify(text: str) -> set[str]:
+    """Every keyword family with a keyword in `text`."""
+    text = text.lower()
+    found = set()
+    for family, kw in _SCANS:
+        if family not in found and kw in text:
+            found.add(family)
+    return found
+
+
+_CLEARANCE_SCANS = [kw for family, kw in _SCANS if family == "clearance"]
+
+
+def requires_clearance(description: str) -> bool:
+    """Scans the clearance family only — for callers that have no classify() hits to read."""
+    description = description.lower()
+    return any(kw in description for kw in _CLEARANCE_SCANS)
+
+
+def remote_type_from(title: str, found: set[str]) -> str | None:
+    """
+    Remote type from the posting text, for sources without a structured field, given the
+    description's classify() hits: a remote phrase anywhere or "remote" in the title → remote,
+    else "hybrid" anywhere → hybrid.
+    """
+    found = found | classify(title)
+    # A bare "remote" only counts in the title — descriptions say "remote" about teams, tools and interviews
+    if "remote" in found or "remote" in title.lower():
+        return "remote"
+    if "hybrid" in found:
+        return "hybrid"
+    return None
@@ -0,0 +1,226 @@
+"""
+Shared DeepSeek client with adaptive concurrency, retries and Retry-After handling.
+
+Every DeepSeek call (scoring, resume parsing, ATS generation) goes through chat_completion(),
+so one limiter sees all of this process's traffic:
+
+  - AIMD concurrency: the in-flight limit grows by ~1 per limit's worth of successful calls
+    and halves on a 429 (or 0.75x on timeouts/5xx and calls slower than
+    DEEPSEEK_LATENCY_TARGET_SECONDS), between 1 and DEEPSEEK_MAX_CONCURRENCY.
+  - A 429's Retry-After pauses every new call in the process, not just the one that got it.
+  - Timeouts, connection errors, 429s and 5xx are retried with jittered exponential backoff,
+    up to DEEPSEEK_MAX_ATTEMPTS; other errors (400, 401, ...) are raised immediately.
+
+llm_metrics() exposes the limiter state and this process's token totals (GET /admin/llm-metrics).
+Each successful call is also recorded as a usage event for its `feature` (services/usage.py).
+"""
+
+import asyncio
+import logging
+import random
+import time
+from email.utils import parsedate_to_datetime
+from openai import APIConnectionError, AsyncOpenAI, InternalServerError, RateLimitError
+from core.config import settings
+from apps.ever_apply.services.usage import recorder
+
+logger = logging.getLogger("ever_apply.llm")
+
+# DeepSeek client — identical to OpenAI client, only base_url differs.
+# Retries are ours (below), so the SDK's own retry loop is off.
+deepseek = AsyncOpenAI(
+    api_key=settings.DEEPSEEK_API_KEY,
+    base_url=settings.DEEPSEEK_BASE_URL,
+    timeout=settings.DEEPSEEK_TIMEOUT_SECONDS,
+    max_retries=0,
+)
+
+BACKOFF_BASE_SECONDS = 1.0
+BACKOFF_MAX_SECONDS = 30.0
+
+
+class AdaptiveLimiter:
+    """AIMD concurrency limiter — see the module docstring."""
+
+    def __init__(self, initial: int, maximum: int, latency_target: float) -> None:
+        self.limit = float(max(1, min(initial, maximum)))
+        self.maximum = maximum
+        self.latency_target = latency_target
+        self.in_flight = 0
+        self.waiting = 0
+        self.paused_until = 0.0
+        self._last_decrease = 0.0
+        self._cond = asyncio.Condition()
+        self.counters = {"calls": 0, "succeeded": 0, "throttled": 0, "errors": 0, "retries": 0, "slow": 0}
+        self.latency_total = 0.0
+
+    async def acquire(self) -> None:
+        async with self._cond:
+            self.waiting += 1
+            try:
+                while True:
+                    pause = self.paused_until - time.monotonic()
+                    if pause > 0:
+                        # Retry-After in effect — sleep it out (woken early only to re-check)
+                        try:
+                            await asyncio.wait_for(self._cond.wait(), pause)
+                        except asyncio.TimeoutError:
+                            pass
+                        continue
+                    if self.in_flight < int(self.limit):
+                        break
+                    await self._cond.wait()
+            finally:
+                self.waiting -= 1
+            self.in_flight += 1
+            self.counters["calls"] += 1
+
+    async def release(self, latency: float | None = None, throttled_for: float | None = None, error: bool = False) -> None:
+        async with self._cond:
+            self.in_flight -= 1
+            if throttled_for is not None:
+                self.counters["throttled"] += 1
+                self.paused_until = max(self.paused_until, time.monotonic() + throttled_for)
+                self._decrease(0.5)
+            elif error:
+                self.counters["errors"] += 1
+                self._decrease(0.75)
+            elif latency is not None:
+                self.counters["succeeded"] += 1
+                self.latency_total += latency
+                if latency > self.latency_target:
+                    self.counters["slow"] += 1
+                    self._decrease(0.75)
+                else:
+                    # Additive increase: +1 to the limit per `limit` successful calls
+                    self.limit = min(self.maximum, self.limit + 1 / self.limit)
+            self._cond.notify_all()
+
+    def _decrease(self, factor: float) -> None:
+        # One cut per latency window — a burst of 429s from the same moment shouldn't collapse the limit to 1
+        now = time.monotonic()
+        if now - self._last_decrease < 1.0:
+            return
+        self._last_decrease = now
+        self.limit = max(1.0, self.limit * factor)
+        logger.info(f"llm limiter: concurrency limit lowered to {int(self.limit)}")
+
+    def metrics(self) -> dict:
+        return {
+            "limit": int(self.limit),
+            "max_limit": self.maximum,
+            "in_flight": self.in_flight,
+            "waiting": self.waiting,
+            "paused_for_s": round(max(0.0, self.paused_until - time.monotonic()), 2),
+            **self.counters,
+            "avg_latency_s": round(self.latency_total / self.counters["succeeded"], 2) if self.counters["succeeded"] else 0.0,
+        }
+
+
+# DeepSeek usage fields worth tracking — prompt_cache_hit/miss_tokens are DeepSeek's context-cache split
+USAGE_FIELDS = ("prompt_tokens", "completion_tokens", "prompt_cache_hit_tokens", "prompt_cache_miss_tokens")
+
+# Token totals for every call this process has made
+_process_usage: dict[str, int] = {}
+
+
+def add_usage(totals: dict | None, response) -> None:
+    """Add a completion's token usage to `totals` (no-op for None or a response without usage)."""
+    usage = getattr(response, "usage", None)
+    if totals is None or usage is None:
+        return
+    for name in USAGE_FIELDS:
+        totals[name] = totals.get(name, 0) + (getattr(usage, name, None) or 0)
+
+
+def cache_hit_rate(totals: dict) -> float:
+    """Share of prompt tokens DeepSeek served from its context cache."""
+    hit = totals.get("prompt_cache_hit_tokens", 0)
+    miss = totals.get("prompt_cache_miss_tokens", 0)
+    return round(hit / (hit + miss), 3) if hit + miss else 0.0
+
+
+limiter = AdaptiveLimiter(
+    settings.DEEPSEEK_INITIAL_CONCURRENCY,
+    settings.DEEPSEEK_MAX_CONCURRENCY,
+    settings.DEEPSEEK_LATENCY_TARGET_SECONDS,
+)
+
+
+def _retry_after(error: RateLimitError) -> float | None:
+    """Seconds to wait from a 429's retry-after-ms / retry-after (seconds or HTTP date) header."""
+    headers = error.response.headers
+    try:
+        if headers.get("retry-after-ms"):
+            return float(headers["retry-after-ms"]) / 1000
+        value = headers.get("retry-after")
+        if not value:
+            return None
+        try:
+            return float(value)
+        except ValueError:
+            return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def _backoff(attempt: int) -> float:
+    return random.uniform(0, min(BACKOFF_MAX_SECONDS, BACKOFF_BASE_SECONDS * 2 ** attempt))
+
+
+async def chat_completion(feature: str, **kwargs):
+    """
+    deepseek.chat.completions.create(**kwargs) behind the shared limiter, with retries.
+    `feature` (score, parse, ats, ideal, realistic) tags the call's usage event.
+    """
+    for attempt in range(1, settings.DEEPSEEK_MAX_ATTEMPTS + 1):
+        await limiter.acquire()
+        start = time.monotonic()
+        try:
+            response = await deepseek.chat.completions.create(**kwargs)
+        except RateLimitError as e:
+            delay = _retry_after(e)
+            delay = _backoff(attempt) if delay is None else delay
+            await limiter.release(throttled_for=delay)
+            error = e
+        except (APIConnectionError, InternalServerError) as e:
+            # APITimeoutError is an APIConnectionError
+            delay = _backoff(attempt)
+            await limiter.release(error=True)
+            error = e
+        except BaseException:
+            await limiter.release()
+            raise
+        else:
+            await limiter.release(latency=time.monotonic() - start)
+            add_usage(_process_usage, response)
+            _record(feature, response)
+            return response
+
+        if attempt == settings.DEEPSEEK_MAX_ATTEMPTS:
+            raise error
+        limiter.counters["retries"] += 1
+        logger.warning(f"DeepSeek call failed ({type(error).__name__}), retry {attempt} in {delay:.1f}s")
+        await asyncio.sleep(delay)
+
+
+def _record(feature: str, response) -> None:
+    usage = {}
+    add_usage(usage, response)
+    recorder.record(
+        "deepseek",
+        feature,
+        model=response.model,
+        prompt_tokens=usage.get("prompt_tokens", 0),
+        completion_tokens=usage.get("completion_tokens", 0),
+        cache_hit_tokens=usage.get("prompt_cache_hit_tokens", 0),
+        cache_miss_tokens=usage.get("prompt_cache_miss_tokens", 0),
+    )
+
+
+def llm_metrics() -> dict:
+    return {
+        **limiter.metrics(),
+        "usage": {name: _process_usage.get(name, 0) for name in USAGE_FIELDS},
+        "prompt_cache_hit_rate": cache_hit_rate(_process_usage),
+    }
@@ -0,0 +1,67 @@
+"""
+MinHash signatures + LSH buckets for near-duplicate job detection.
+
+A job's text (title + description, HTML stripped) is cut into overlapping word shingles;
+its signature is the minimum of NUM_PERM salted hashes over those shingles. Two signatures
+agree in a position with probability equal to the Jaccard similarity of the shingle sets.
+
+The signature is split into LSH_BANDS bands of LSH_ROWS positions, and each band is hashed
+to one bucket. Jobs sharing any bucket are near-duplicate candidates (~45% similar and up,
+found by the GIN-indexed `&&` on everapply_jobs.lsh_buckets); candidates are then confirmed
+with the signature estimate against NEAR_DUPLICATE_THRESHOLD.
+"""
+
+import hashlib
+import re
+
+NUM_PERM = 64
+LSH_BANDS = 16
+LSH_ROWS = NUM_PERM // LSH_BANDS
+SHINGLE_WORDS = 3
+MIN_SHINGLES = 20  # Shorter texts (e.g. a bare title) are too generic to call anything a duplicate
+NEAR_DUPLICATE_THRESHOLD = 0.7  # Reposts with a new title suffix score ~0.95; rewritten postings well under 0.5
+
+_TAG = re.compile(r"<[^>]+>")
+_WORD = re.compile(r"[a-z0-9]+")
+
+
+def _hash64(data: bytes) -> int:
+    return int.from_bytes(hashlib.blake2b(data, digest_size=8).digest(), "little")
+
+
+# One fixed salt per permutation — shingle hashes are already uniform 64-bit values, so XOR with a
+# salt is a cheap stand-in for a random permutation (min(map(salt.__xor__, ...)) runs in C, ~3x
+# faster than universal hashing in pure Python). Derived from constants, so stable across deploys.
+_SALTS = [_hash64(f"minhash-{i}".encode()) >> 1 for i in range(NUM_PERM)]
+
+
+def shingles(text: str) -> set[int]:
+    """Hashed word shingles, 63-bit so signatures fit a Postgres BIGINT."""
+    words = _WORD.findall(_TAG.sub(" ", text).lower())
+    return {
+        _hash64(" ".join(words[i:i + SHINGLE_WORDS]).encode()) >> 1
+        for i in range(len(words) - SHINGLE_WORDS + 1)
+    }
+
+
+def signature(title: str | None, description: str | None) -> list[int] | None:
+    """MinHash signature of a job's title + description, or None if the text is too short to compare."""
+    hashed = shingles(f"{title or ''} {description or ''}")
+    if len(hashed) < MIN_SHINGLES:
+        return None
+    return [min(map(salt.__xor__, hashed)) for salt in _SALTS]
+
+
+def lsh_buckets(sig: list[int]) -> list[int]:
+    """One bucket per band — the band index is hashed in so equal rows in different bands don't collide."""
+    buckets = []
+    for band in range(LSH_BANDS):
+        rows = sig[band * LSH_ROWS:(band + 1) * LSH_ROWS]
+        digest = _hash64(f"{band}:{','.join(map(str, rows))}".encode())
+        buckets.append(digest - (1 << 63))  # Signed, to fit a Postgres BIGINT
+    return buckets
+
+
+def similarity(a: list[int], b: list[int]) -> float:
+    """Estimated Jaccard similarity — the share of signature positions that agree."""
+    return sum(1 for x, y in zip(a, b) if x == y) / NUM_PERM
@@ -0,0 +1,53 @@
+from dataclasses import dataclass, field
+from core.config import settings
+
+DEFAULT_KEYWORDS = ["software engineer", "developer"]
+
+
+def search_params(user) -> tuple[list[str], str, bool]:
+    """Indeed search inputs for one user: (keywords, location, remote)."""
+    # User-specific keywords from their parsed titles
+    keywords = list(dict.fromkeys(user.parsed_data.get("titles", [])))[:5] or DEFAULT_KEYWORDS
+
+    # Location: only pass it for onsite/hybrid users
+    prefs = user.preferences or {}
+    remote_pref = prefs.get("remote_type")
+    # An explicitly cleared preference is stored as null
+    location = (prefs.get("preferred_location") or "") if remote_pref in ("onsite", "hybrid") else ""
+    return keywords, location, remote_pref == "remote"
+
+
+@dataclass
+class SearchGroup:
+    """One Apify actor call whose results are shared by every user in user_ids."""
+    keywords: list[str]
+    location: str
+    remote: bool
+    user_ids: list = field(default_factory=list)
+
+
+def plan_searches(users) -> list[SearchGroup]:
+    """
+    Group users by normalized (keywords, location, remote) so identical searches run once.
+    Keywords are lowercased, stripped and sorted — Indeed treats the query as a bag of words,
+    so "React Developer, Frontend Engineer" and "frontend engineer, react developer" share a call.
+    """
+    groups: dict[tuple, SearchGroup] = {}
+    for user in users:
+        keywords, location, remote = search_params(user)
+        normalized = sorted({kw.lower().strip() for kw in keywords if kw.strip()}) or DEFAULT_KEYWORDS
+        key = (tuple(normalized), location.lower().strip(), remote)
+        group = groups.get(key)
+        if group is None:
+            group = groups[key] = SearchGroup(keywords=normalized, location=location.strip(), remote=remote)
+        group.user_ids.append(user.id)
+    return list(groups.values())
+
+
+def apify_savings(results_per_group: list[tuple[SearchGroup, int]]) -> tuple[int, float]:
+    """
+    Results (and USD at EVER_APPLY_APIFY_PPR) a per-user plan would have paid for on top of this one.
+    Each group of N users saved N - 1 actor calls returning the same result count.
+    """
+    saved_results = sum(count * (len(group.user_ids) - 1) for group, count in results_per_group)
+    return saved_results, saved_results / 1000 * settings.EVER_APPLY_APIFY_PPR
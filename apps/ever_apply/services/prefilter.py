@@ -0,0 +1,116 @@
+import re
+from apps.ever_apply.services.scoring import SKILL_SYNONYMS
+
+# Reason stored on matches the prefilter scores locally instead of sending to DeepSeek
+PREFILTER_REASON = "No skill or title overlap with your resume."
+
+# Keeps "node.js", "c++", "c#" and "ci/cd"-style parts as single tokens; trailing punctuation is dropped
+_TOKEN_RE = re.compile(r"[a-z0-9+#]+(?:\.[a-z0-9+#]+)*")
+
+
+# Filler words and bare numbers aren't stored per job (see description_tokens) — they are in nearly
+# every description, so they would bloat the GIN index without ever narrowing a lookup
+_STOPWORDS = frozenset(
+    "a an and are as at be but by can for from has have in is it its of on or our that the their "
+    "this to we will with you your".split()
+)
+
+
+def _indexed(token: str) -> bool:
+    return token not in _STOPWORDS and not token.isdigit()
+
+
+def _tokens(text: str) -> list[str]:
+    return _TOKEN_RE.findall(text.lower())
+
+
+def _phrase(term: str) -> tuple[str, ...]:
+    return tuple(_tokens(term))
+
+
+# Every phrase in a synonym group expands to the whole group, so "TypeScript" on a resume
+# counts "Node.js" in a description as overlap — the same equivalences the scoring prompt states
+_SYNONYM_GROUPS: dict[tuple[str, ...], list[tuple[str, ...]]] = {}
+for _group in SKILL_SYNONYMS:
+    _phrases = [_phrase(term) for term in _group]
+    for _p in _phrases:
+        _SYNONYM_GROUPS[_p] = _phrases
+
+
+def _resume_terms(parsed_data: dict) -> list[list[tuple[str, ...]]]:
+    """Each resume skill/title as the list of phrases that count as a hit for it."""
+    terms = {}
+    for term in (parsed_data.get("skills") or []) + (parsed_data.get("titles") or []):
+        phrase = _phrase(term)
+        if phrase and phrase not in terms:
+            terms[phrase] = _SYNONYM_GROUPS.get(phrase, [phrase])
+    return list(terms.values())
+
+
+def _ngrams(tokens: list[str], max_n: int) -> set[tuple[str, ...]]:
+    grams = set()
+    for n in range(1, max_n + 1):
+        grams.update(tuple(tokens[i:i + n]) for i in range(len(tokens) - n + 1))
+    return grams
+
+
+def description_tokens(description: str) -> list[str]:
+    """
+    Distinct tokens of a description, sorted, without stopwords or bare numbers — stored per job
+    as everapply_jobs.description_tokens. Resume skills are free text, not a fixed lexicon, so any
+    word could be the one a resume term is looked up by; only words no term is looked up by are dropped.
+    """
+    return sorted({token for token in _tokens(description) if _indexed(token)})
+
+
+def required_tokens(parsed_data: dict) -> list[str] | None:
+    """
+    First stored token (see description_tokens) of every phrase that counts as a hit for the
+    resume's skills/titles. A job whose description_tokens share none of these has zero overlap —
+    load_unmatched_job_rows drops it in SQL. None when the resume has no terms, since prefilter()
+    is skipped then too, or when a phrase is all stopwords/numbers and so can't be looked up.
+    """
+    terms = _resume_terms(parsed_data)
+    if not terms:
+        return None
+    tokens = set()
+    for phrases in terms:
+        for phrase in phrases:
+            indexed = [token for token in phrase if _indexed(token)]
+            if not indexed:
+                return None
+            tokens.add(indexed[0])
+    return sorted(tokens)
+
+
+def skill_overlap(parsed_data: dict, descriptions: list[str]) -> list[int]:
+    """
+    For a whole batch of descriptions, count how many distinct resume skills/titles
+    (or their synonyms) appear in each one. Each description is tokenized once into a
+    set of n-grams, so every term check is a set lookup.
+    """
+    terms = _resume_terms(parsed_data)
+    if not terms:
+        return [0] * len(descriptions)
+    max_n = max(len(phrase) for phrases in terms for phrase in phrases)
+
+    overlaps = []
+    for description in descriptions:
+        grams = _ngrams(_tokens(description or ""), max_n)
+        overlaps.append(sum(1 for phrases in terms if any(phrase in grams for phrase in phrases)))
+    return overlaps
+
+
+def prefilter(parsed_data: dict, candidates: list, min_overlap: int) -> tuple[list, list]:
+    """
+    Split (job, description) candidates into (to_score, rejected) by skill overlap.
+    Rejected jobs get a local zero score instead of a DeepSeek call. min_overlap <= 0 disables the stage,
+    and so does a resume with no skills or titles — with nothing to overlap, every job would be rejected.
+    """
+    if min_overlap <= 0 or not candidates or not _resume_terms(parsed_data):
+        return candidates, []
+    overlaps = skill_overlap(parsed_data, [description for _, description in candidates])
+    keep, rejected = [], []
+    for candidate, overlap in zip(candidates, overlaps):
+        (keep if overlap >= min_overlap else rejected).append(candidate)
+    return keep, rejected
@@ -1,41 +1,31 @@
+import asyncio
 import json
-import boto3
+import logging
 import fitz
 from io import BytesIO
-from urllib.parse import urlparse
 from fastapi import HTTPException
-from openai import AsyncOpenAI
 from core.config import settings
 from apps.ever_apply.schemas import ParsedData
+from apps.ever_apply.services.llm import chat_completion
+from apps.ever_apply.services.storage import delete_objects, object_key, r2_client
 
-# DeepSeek client — identical to OpenAI client, only base_url differs
-deepseek = AsyncOpenAI(api_key=settings.DEEPSEEK_API_KEY, base_url=settings.DEEPSEEK_BASE_URL)
+logger = logging.getLogger("ever_apply.resume")
 
 
-# R2 client (S3-compatible — only the endpoint_url changes vs real S3)
-def get_r2_client():
-    return boto3.client(
-        "s3",
-        endpoint_url=f"https://{settings.R2_ACCOUNT_ID}.r2.cloudflarestorage.com",
-        aws_access_key_id=settings.R2_ACCESS_KEY_ID,
-        aws_secret_access_key=settings.R2_SECRET_ACCESS_KEY,
-        region_name="auto",  # Required by Cloudflare R2
-    )
-
-
-# 1a. Delete existing resume from R2 by its public URL
+# 1a. Delete existing resume from R2 by its public URL — a failed delete leaves an orphan file, never a failed upload
 async def delete_resume(resume_url: str) -> None:
-    key = urlparse(resume_url).path.lstrip("/")
-    client = get_r2_client()
-    client.delete_object(Bucket=settings.R2_BUCKET_NAME, Key=key)
+    failed = await delete_objects([object_key(resume_url)])
+    if failed:
+        logger.warning(f"resume: failed to delete old resume {failed[0]} from R2")
 
 
 # 1b. Upload PDF to R2, return public URL
 async def upload_resume(file_bytes: bytes, filename: str, clerk_user_id: str) -> str:
-    client = get_r2_client()
     prefix = "development/resumes" if settings.ENV == "development" else "resumes"
     key = f"{prefix}/{clerk_user_id}/{filename}"
-    client.put_object(
+    # boto3 is blocking — run the request in a worker thread so the event loop keeps serving
+    await asyncio.to_thread(
+        r2_client().put_object,
         Bucket=settings.R2_BUCKET_NAME,
         Key=key,
         Body=file_bytes,
@@ -52,7 +42,8 @@ def extract_text(file_bytes: bytes) -> str:
 
 # 3. Parse with DeepSeek → structured JSON validated against ParsedData schema
 async def parse_resume(text: str) -> dict:
-    response = await deepseek.chat.completions.create(
+    response = await chat_completion(
+        feature="parse",
         model="deepseek-chat",
         response_format={"type": "json_object"},
         messages=[
@@ -0,0 +1,88 @@
+from datetime import datetime, timedelta
+from sqlalchemy import func, literal, null, select, update
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from core.config import settings
+from apps.ever_apply.models import Run, RunStatus, RunUser, RunUserStatus
+
+
+async def start_run(db: AsyncSession, kind: str, user_ids: list) -> tuple[Run, dict]:
+    """
+    Resume the latest RUNNING run of `kind` started within EVER_APPLY_RUN_RESUME_HOURS,
+    or start a new one. Older RUNNING runs are marked FAILED — their results are stale.
+    Returns (run, {user_id: RunUser}) with a checkpoint row for every user in user_ids. Commits.
+    """
+    resume_cutoff = datetime.utcnow() - timedelta(hours=settings.EVER_APPLY_RUN_RESUME_HOURS)
+    await db.execute(
+        update(Run)
+        .where(Run.kind == kind, Run.status == RunStatus.RUNNING, Run.started_at < resume_cutoff)
+        .values(status=RunStatus.FAILED, finished_at=datetime.utcnow())
+    )
+
+    result = await db.execute(
+        select(Run)
+        .where(Run.kind == kind, Run.status == RunStatus.RUNNING)
+        .order_by(Run.started_at.desc())
+        .limit(1)
+    )
+    run = result.scalar_one_or_none()
+    if run is None:
+        run = Run(kind=kind)
+        db.add(run)
+        await db.flush()
+
+    if user_ids:
+        # Users who became eligible since an interrupted run started are added as PENDING
+        await db.execute(
+            insert(RunUser)
+            .values([{"run_id": run.id, "user_id": user_id, "status": RunUserStatus.PENDING} for user_id in user_ids])
+            .on_conflict_do_nothing(index_elements=[RunUser.run_id, RunUser.user_id])
+        )
+        # A PENDING user's search is fetched again, so drop whatever a cut-off stream checkpointed
+        await db.execute(
+            update(RunUser)
+            .where(RunUser.run_id == run.id, RunUser.status == RunUserStatus.PENDING, RunUser.job_ids.isnot(None))
+            .values(job_ids=null())
+        )
+    result = await db.execute(select(RunUser).where(RunUser.run_id == run.id))
+    checkpoints = {checkpoint.user_id: checkpoint for checkpoint in result.scalars().all()}
+    await db.commit()
+    return run, checkpoints
+
+
+async def add_fetched_jobs(db: AsyncSession, run_id, user_ids: list, job_ids: list) -> None:
+    """Append one page's jobs to these users' checkpoints — commit in the same transaction as the page's upsert."""
+    page = literal([str(job_id) for job_id in job_ids], JSONB)
+    await db.execute(
+        update(RunUser)
+        .where(RunUser.run_id == run_id, RunUser.user_id.in_(user_ids))
+        .values(job_ids=func.coalesce(RunUser.job_ids, literal([], JSONB)).op("||")(page), updated_at=datetime.utcnow())
+    )
+
+
+async def mark_fetched(db: AsyncSession, run_id, user_ids: list) -> None:
+    """Record that these users' search is fully in — their checkpoint holds every job it fetched."""
+    await db.execute(
+        update(RunUser)
+        .where(RunUser.run_id == run_id, RunUser.user_id.in_(user_ids))
+        .values(status=RunUserStatus.FETCHED, updated_at=datetime.utcnow())
+    )
+
+
+async def mark_done(db: AsyncSession, run_id, user_id, matches_created: int) -> None:
+    """Record a finished user — commit in the same transaction as that user's matches."""
+    await db.execute(
+        update(RunUser)
+        .where(RunUser.run_id == run_id, RunUser.user_id == user_id)
+        .values(status=RunUserStatus.DONE, matches_created=matches_created, updated_at=datetime.utcnow())
+    )
+
+
+async def finish_run(db: AsyncSession, run_id, stats: dict, status: RunStatus = RunStatus.COMPLETED) -> None:
+    await db.execute(
+        update(Run)
+        .where(Run.id == run_id)
+        .values(status=status, stats=stats, finished_at=datetime.utcnow())
+    )
+    await db.commit()
@@ -0,0 +1,85 @@
+import hashlib
+import json
+from datetime import datetime
+from sqlalchemy import delete, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from apps.ever_apply.models import ScoreCache
+from apps.ever_apply.services.scoring import SCORING_PROMPT_VERSION
+
+
+def score_cache_key(resume_context: str, job_description: str, user_preferences: dict | None = None) -> str:
+    """
+    sha256 over everything that can change a score: prompt version, resume context,
+    job description and the preferences score_match reads (remote_type).
+    Bump SCORING_PROMPT_VERSION whenever the scoring prompt changes to invalidate old entries.
+    """
+    prefs = user_preferences or {}
+    payload = json.dumps(
+        [SCORING_PROMPT_VERSION, resume_context, job_description, prefs.get("remote_type")],
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+async def load_cached_scores(db: AsyncSession, keys) -> dict[str, dict]:
+    """One query for a whole batch of keys — returns {key: {"score", "reason"}} for the hits."""
+    if not keys:
+        return {}
+    result = await db.execute(
+        select(ScoreCache.key, ScoreCache.score, ScoreCache.reason).where(ScoreCache.key.in_(list(keys)))
+    )
+    return {key: {"score": score, "reason": reason} for key, score, reason in result}
+
+
+async def store_scores(db: AsyncSession, entries: dict[str, dict]) -> None:
+    """Insert new entries; a concurrent run that already cached the same key wins. Caller commits."""
+    if not entries:
+        return
+    await db.execute(
+        insert(ScoreCache)
+        .values([
+            {"key": key, "score": result.get("score", 0), "reason": result.get("reason", "")}
+            for key, result in entries.items()
+        ])
+        .on_conflict_do_nothing(index_elements=[ScoreCache.key])
+    )
+
+
+async def prune_scores(db: AsyncSession, older_than: datetime, limit: int) -> int:
+    """
+    Delete up to `limit` entries created before `older_than` — the jobs they scored are long gone,
+    and a repost old enough to miss simply costs one DeepSeek call. Returns the count. Caller commits.
+    """
+    doomed = select(ScoreCache.key).where(ScoreCache.created_at < older_than).limit(limit)
+    result = await db.execute(delete(ScoreCache).where(ScoreCache.key.in_(doomed)))
+    return result.rowcount
+
+
+async def score_with_cache(db: AsyncSession, resume_context: str, candidates: list, user_preferences: dict | None, score_fn) -> tuple[list, int, int]:
+    """
+    Score (job, description) candidates, calling DeepSeek only for cache misses.
+    `score_fn(descriptions)` is awaited once with every distinct miss and returns a list of
+    score_match dicts aligned with it, None where scoring failed (failures are not cached).
+    Returns ([(job, result), ...], hits, misses) — failed candidates are left out.
+    """
+    keys = [score_cache_key(resume_context, description, user_preferences) for _, description in candidates]
+    cached = await load_cached_scores(db, set(keys))
+
+    # Identical descriptions in one batch (reposts under a new URL) only cost one call
+    misses = {}
+    for (_, description), key in zip(candidates, keys):
+        if key not in cached and key not in misses:
+            misses[key] = description
+
+    fresh = await score_fn(list(misses.values())) if misses else []
+    new_entries = {key: result for key, result in zip(misses, fresh) if result is not None}
+    await store_scores(db, new_entries)
+
+    scored = []
+    for (job, _), key in zip(candidates, keys):
+        result = cached.get(key) or new_entries.get(key)
+        if result is not None:
+            scored.append((job, result))
+    hits = sum(1 for key in keys if key in cached)
+    return scored, hits, len(keys) - hits
@@ -1,49 +1,171 @@
+import asyncio
 import json
-from openai import AsyncOpenAI
+import logging
 from core.config import settings
+from apps.ever_apply.services.llm import add_usage, chat_completion
 
-# DeepSeek client — identical to OpenAI client, only base_url differs
-deepseek = AsyncOpenAI(api_key=settings.DEEPSEEK_API_KEY, base_url=settings.DEEPSEEK_BASE_URL)
+# Part of every score cache key — bump whenever the prompt or model below changes
+SCORING_PROMPT_VERSION = 2
 
+# Equivalences the prompt tells DeepSeek to apply — the local prefilter (services/prefilter.py) uses the same groups
+SKILL_SYNONYMS = [
+    ["JavaScript", "Node.js", "TypeScript"],
+    ["React", "Frontend Engineer"],
+    ["Python", "Backend Engineer"],
+    ["REST APIs", "RESTful APIs", "API development"],
+]
+SYNONYM_INSTRUCTION = ", ".join(" = ".join(group) for group in SKILL_SYNONYMS)
 
-async def score_match(resume_summary: str, job_description: str, user_preferences: dict | None = None) -> dict:
+# Rubric shared by single and batch scoring so both modes score on the same scale
+SCORING_GUIDE = (
+    "Scoring guide: "
+    "90-100 = strong match on all required skills and correct seniority level; "
+    "70-89 = matches core requirements with minor gaps in preferred skills; "
+    "50-69 = partial match, missing one or more key required skills; "
+    "below 50 = significant mismatch in skills or seniority. "
+    "Weight required skills heavily over preferred/nice-to-have skills. "
+    f"Treat these as equivalent: {SYNONYM_INSTRUCTION}. "
+    "In the reason, name the strongest skill overlap and list up to 3 specific missing keywords the candidate should add to their resume to improve this match."
+)
+
+# Identical for every scoring call — single and batch, every user — so it is always the cached head of the prompt
+SCORING_SYSTEM_PROMPT = f"You are a technical recruiter scoring resume-to-job fit. {SCORING_GUIDE}"
+
+SINGLE_INSTRUCTION = "Score this job. Respond with JSON: {\"score\": <0-100>, \"reason\": <one sentence>}."
+BATCH_INSTRUCTION = (
+    "Score each of these jobs independently. "
+    "Respond with JSON: {\"results\": [{\"job_ref\": <job_ref>, \"score\": <0-100>, \"reason\": <one sentence>}]} "
+    "with exactly one entry per job, using the job_ref shown before each job."
+)
+
+logger = logging.getLogger("ever_apply.scoring")
+
+
+def build_scoring_messages(resume_summary: str, instruction: str, jobs_block: str) -> list[dict]:
+    """
+    Order the prompt from most to least stable so DeepSeek's context cache can reuse the prefix:
+    the system rubric (shared by every call), then the resume (shared by all of a user's jobs,
+    in both single and batch mode), and only then the per-call instruction and job text.
+    Cached prefix tokens are billed at the much cheaper cache-hit rate.
+    """
+    return [
+        {"role": "system", "content": SCORING_SYSTEM_PROMPT},
+        {"role": "user", "content": f"Resume:\n{resume_summary}"},
+        {"role": "user", "content": f"{instruction}\n\n{jobs_block}"},
+    ]
+
+
+async def score_match(resume_summary: str, job_description: str, user_preferences: dict | None = None, usage: dict | None = None) -> dict:
     """
     Ask DeepSeek to score how well a resume matches a job description.
     Returns: {"score": 85, "reason": "Strong React and TypeScript overlap"}
     Score is 0-100. DeepSeek handles synonym reasoning natively (React = Frontend Engineer).
     If user_preferences includes remote_type, DeepSeek will return score 0 on work arrangement mismatch.
+    Token usage, including prompt cache hits/misses, is added to `usage` when given.
     """
-    prefs = user_preferences or {}
+    response = await chat_completion(
+        feature="score",
+        model="deepseek-chat",
+        response_format={"type": "json_object"},
+        messages=build_scoring_messages(resume_summary, SINGLE_INSTRUCTION, f"Job:\n{job_description}"),
+    )
+    add_usage(usage, response)
+    return json.loads(response.choices[0].message.content)
+
 
-    preference_instruction = ""
-    pref_context = ""
+def _valid_result(entry) -> bool:
+    score = entry.get("score")
+    return (
+        isinstance(score, (int, float))
+        and not isinstance(score, bool)
+        and 0 <= score <= 100
+        and isinstance(entry.get("reason"), str)
+    )
 
-    response = await deepseek.chat.completions.create(
+
+async def score_match_batch(resume_summary: str, job_descriptions: list[str], user_preferences: dict | None = None, usage: dict | None = None) -> list[dict | None]:
+    """
+    Score several job descriptions against one resume in a single DeepSeek completion —
+    the rubric and resume are sent once instead of once per job.
+    Returns one entry per description, in order: {"score", "reason"}, or None where
+    DeepSeek's entry was missing or invalid (the caller falls back to score_match for those).
+    """
+    refs = [str(i + 1) for i in range(len(job_descriptions))]
+    jobs_block = "\n\n".join(
+        f"[job_ref: {ref}]\n{description}" for ref, description in zip(refs, job_descriptions)
+    )
+
+    response = await chat_completion(
+        feature="score",
         model="deepseek-chat",
         response_format={"type": "json_object"},
-        messages=[
-            {
-                "role": "system",
-                "content": (
-                    "You are a technical recruiter scoring resume-to-job fit. "
-                    "Respond with JSON: {\"score\": <0-100>, \"reason\": <one sentence>}. "
-                    f"{preference_instruction}"
-                    "Scoring guide: "
-                    "90-100 = strong match on all required skills and correct seniority level; "
-                    "70-89 = matches core requirements with minor gaps in preferred skills; "
-                    "50-69 = partial match, missing one or more key required skills; "
-                    "below 50 = significant mismatch in skills or seniority. "
-                    "Weight required skills heavily over preferred/nice-to-have skills. "
-                    "Treat these as equivalent: JavaScript = Node.js = TypeScript, "
-                    "React = Frontend Engineer, Python = Backend Engineer, "
-                    "REST APIs = RESTful APIs = API development. "
-                    "In the reason, name the strongest skill overlap and list up to 3 specific missing keywords the candidate should add to their resume to improve this match."
-                ),
-            },
-            {
-                "role": "user",
-                "content": f"Resume:\n{resume_summary}{pref_context}\n\nJob:\n{job_description}",
-            },
-        ],
+        messages=build_scoring_messages(resume_summary, BATCH_INSTRUCTION, f"Jobs:\n{jobs_block}"),
     )
-    return json.loads(response.choices[0].message.content)
+    add_usage(usage, response)
+
+    results: dict[str, dict] = {}
+    try:
+        entries = json.loads(response.choices[0].message.content).get("results", [])
+    except (json.JSONDecodeError, AttributeError):
+        entries = []
+    for entry in entries if isinstance(entries, list) else []:
+        if not isinstance(entry, dict):
+            continue
+        ref = str(entry.get("job_ref", "")).strip()
+        if ref in refs and ref not in results and _valid_result(entry):
+            results[ref] = {"score": entry["score"], "reason": entry["reason"]}
+    return [results.get(ref) for ref in refs]
+
+
+async def score_descriptions(
+    resume_summary: str,
+    job_descriptions: list[str],
+    user_preferences: dict | None = None,
+    limiter: asyncio.Semaphore | None = None,
+    batch_size: int | None = None,
+    usage: dict | None = None,
+) -> tuple[list[dict | None], int, int]:
+    """
+    Score many descriptions for one resume, EVER_APPLY_SCORING_BATCH_SIZE per completion.
+    Entries a batch leaves missing or invalid — or a whole batch that errors — are retried
+    one at a time with score_match. `limiter` bounds concurrent DeepSeek calls; token usage
+    from every completion is added to `usage` when given.
+    Returns (results aligned with job_descriptions, None where scoring failed; llm_calls; errors).
+    """
+    batch_size = batch_size or settings.EVER_APPLY_SCORING_BATCH_SIZE
+    limiter = limiter or asyncio.Semaphore(settings.EVER_APPLY_SCORING_CONCURRENCY)
+    calls = 0
+    errors = 0
+
+    async def _single(description):
+        nonlocal calls, errors
+        async with limiter:
+            calls += 1
+            try:
+                return await score_match(resume_summary, description, user_preferences=user_preferences, usage=usage)
+            except Exception:
+                errors += 1
+                logger.exception("score_match failed")
+                return None
+
+    async def _chunk(chunk):
+        nonlocal calls
+        if len(chunk) == 1:
+            return [await _single(chunk[0])]
+        async with limiter:
+            calls += 1
+            try:
+                results = await score_match_batch(resume_summary, chunk, user_preferences=user_preferences, usage=usage)
+            except Exception:
+                logger.exception(f"score_match_batch failed for {len(chunk)} jobs — falling back to single scoring")
+                results = [None] * len(chunk)
+        missing = [i for i, result in enumerate(results) if result is None]
+        if missing:
+            retried = await asyncio.gather(*(_single(chunk[i]) for i in missing))
+            for i, result in zip(missing, retried):
+                results[i] = result
+        return results
+
+    chunks = [job_descriptions[i:i + batch_size] for i in range(0, len(job_descriptions), max(batch_size, 1))]
+    scored = await asyncio.gather(*(_chunk(chunk) for chunk in chunks))
+    return [result for chunk in scored for result in chunk], calls, errors
@@ -1,8 +1,17 @@
+import asyncio
+import html
+import logging
 import re
 import httpx
-from datetime import datetime, timedelta
-from apify_client import ApifyClient
+from collections.abc import AsyncIterator
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from apify_client import ApifyClientAsync
 from core.config import settings
+from apps.ever_apply.services.keywords import classify, remote_type_from
+from apps.ever_apply.services.usage import recorder
+
+logger = logging.getLogger("ever_apply.scraper")
 
 
 def _parse_age(age_str: str) -> datetime:
@@ -24,33 +33,75 @@ def _parse_age(age_str: str) -> datetime:
     }.get(unit, timedelta())
     return now - delta
 
-# Initialize Apify client
-apify = ApifyClient(settings.APIFY_API_TOKEN)
+# Initialize Apify client — async, so actor runs never block the event loop
+apify = ApifyClientAsync(settings.APIFY_API_TOKEN)
+
+# Caps concurrent actor runs across the process (scheduler groups + admin triggers)
+_apify_slots = asyncio.Semaphore(settings.EVER_APPLY_APIFY_CONCURRENCY)
+
+# One pooled HTTP client for every Greenhouse/Lever request — connections are reused across boards and runs.
+# Closed on shutdown by main.py's lifespan and the standalone worker
+http = httpx.AsyncClient(
+    timeout=settings.EVER_APPLY_BOARD_TIMEOUT_SECONDS,
+    limits=httpx.Limits(max_connections=2 * settings.EVER_APPLY_BOARD_CONCURRENCY),
+    follow_redirects=True,
+)
+
+# Per-source caps, so a long board list can't flood one provider
+_board_slots = {
+    "greenhouse": asyncio.Semaphore(settings.EVER_APPLY_BOARD_CONCURRENCY),
+    "lever": asyncio.Semaphore(settings.EVER_APPLY_BOARD_CONCURRENCY),
+}
+
+
+# Board sources list live postings — they stay valid as long as the board still returns them
+BOARD_SOURCES = ("greenhouse", "lever")
 
 
-def _normalize_job(raw: dict, source: str) -> dict:
-    """Normalize a raw job dict from any source into the Job model shape."""
-    posted_at = raw.get("posted_at") or raw.get("postedAt") or raw.get("date")
+# Lever's workplaceType → RemoteType; "unspecified" maps to nothing, so the keyword fallback runs
+LEVER_WORKPLACE_TYPES = {"on-site": "onsite", "remote": "remote", "hybrid": "hybrid"}
+
+
+def _normalize_job(raw: dict, source: str, company: str = "") -> dict:
+    """Normalize a raw job dict from any source into the Job model shape. `company` is the fallback company name."""
+    # Greenhouse: first_published/updated_at (ISO), Lever: createdAt (epoch ms)
+    posted_at = raw.get("posted_at") or raw.get("postedAt") or raw.get("date") or raw.get("first_published") or raw.get("updated_at") or raw.get("createdAt")
     if isinstance(posted_at, str):
         try:
             posted_at = datetime.fromisoformat(posted_at.replace("Z", "+00:00"))
         except ValueError:
             posted_at = _parse_age(raw.get("age", ""))
+    elif isinstance(posted_at, (int, float)):
+        posted_at = datetime.utcfromtimestamp(posted_at / 1000)
     elif not posted_at:
         posted_at = _parse_age(raw.get("age", ""))
+    if posted_at.tzinfo is not None:
+        # Job timestamps are naive UTC
+        posted_at = posted_at.astimezone(timezone.utc).replace(tzinfo=None)
 
-    location = raw.get("location") or raw.get("jobLocation", "")
+    location = raw.get("location") or raw.get("jobLocation") or (raw.get("categories") or {}).get("location", "")
     if isinstance(location, dict):
-        location = location.get("formattedAddressShort") or location.get("formattedAddressLong") or ""
+        location = location.get("formattedAddressShort") or location.get("formattedAddressLong") or location.get("name") or ""
 
     # Company — borderline returns employer as an object with a name field
     company = (
         raw.get("company")
         or raw.get("companyName")
         or (raw.get("employer") or {}).get("name")
-        or ""
+        or raw.get("company_name")
+        or company
+    )
+
+    # Greenhouse returns HTML-escaped content, Lever a plain-text description
+    description = (
+        raw.get("description") or raw.get("jobDescription") or raw.get("descriptionText")
+        or raw.get("descriptionHtml") or raw.get("descriptionPlain") or html.unescape(raw.get("content") or "")
     )
 
+    title = raw.get("title") or raw.get("jobTitle") or raw.get("text") or ""
+    # One keyword scan of the description — the remote fallback below and ingest's clearance flag both read it
+    keyword_families = classify(description)
+
     # Remote type — check attributes array first (more specific), fall back to isRemote boolean,
     # then fall back to scanning title and description for remote keywords
     attributes = [a.lower() for a in (raw.get("attributes") or [])]
@@ -63,37 +114,59 @@ def _normalize_job(raw: dict, source: str) -> dict:
     elif raw.get("isRemote") is True:
         remote_type = "remote"
     else:
-        remote_type = raw.get("remote_type") or raw.get("workType") or None
+        remote_type = raw.get("remote_type") or raw.get("workType") or LEVER_WORKPLACE_TYPES.get(raw.get("workplaceType"))
 
     if not remote_type:
-        title = (raw.get("title") or raw.get("jobTitle") or "").lower()
-        description = (raw.get("description") or raw.get("jobDescription") or raw.get("descriptionText") or raw.get("descriptionHtml") or "").lower()
-        text = f"{title} {description}"
-        if "remote-first" in text or "fully remote" in text or "100% remote" in text or "work from anywhere" in text or "work from home" in text:
-            remote_type = "remote"
-        elif "remote" in title:
-            remote_type = "remote"
-        elif "hybrid" in text:
-            remote_type = "hybrid"
+        remote_type = remote_type_from(title, keyword_families)
 
     return {
-        "title": raw.get("title") or raw.get("jobTitle", ""),
+        "title": title,
         "company": company,
-        "description": raw.get("description") or raw.get("jobDescription") or raw.get("descriptionText") or raw.get("descriptionHtml", ""),
+        "description": description,
         "location": location,
         "remote_type": remote_type,
         "salary_min": raw.get("salary_min") or raw.get("salaryMin") or (raw.get("salary") or {}).get("salaryMin"),
         "salary_max": raw.get("salary_max") or raw.get("salaryMax") or (raw.get("salary") or {}).get("salaryMax"),
         "posted_at": posted_at,
-        "expires_at": posted_at + timedelta(hours=24),
+        "expires_at": (datetime.utcnow() if source in BOARD_SOURCES else posted_at) + timedelta(hours=24),
         "source": source,
-        "source_url": raw.get("url") or raw.get("jobUrl") or raw.get("applyUrl", ""),
+        "source_url": raw.get("url") or raw.get("jobUrl") or raw.get("applyUrl") or raw.get("absolute_url") or raw.get("hostedUrl", ""),
         "raw_json": raw,
+        "keyword_families": keyword_families,  # Read by ingest's job_features, not stored
     }
 
 
-async def fetch_indeed_jobs(keywords: list[str], location: str = "", remote: bool = False) -> list[dict]:
-    """Scrape Indeed jobs via Apify actor borderline/indeed-scraper (PPR)."""
+class JobDeduper:
+    """Drops repeats by source_url OR (title, company) across every batch it sees — first occurrence wins."""
+
+    def __init__(self) -> None:
+        self.seen_urls = set()
+        self.seen_title_company = set()
+
+    def filter(self, jobs: list[dict]) -> list[dict]:
+        unique_jobs = []
+        for job in jobs:
+            url = job["source_url"]
+            title_company = (job["title"].lower().strip(), job["company"].lower().strip())
+
+            if (url and url in self.seen_urls) or title_company in self.seen_title_company:
+                continue
+
+            if url:
+                self.seen_urls.add(url)
+            self.seen_title_company.add(title_company)
+            unique_jobs.append(job)
+
+        return unique_jobs
+
+
+async def stream_indeed_jobs(keywords: list[str], location: str = "", remote: bool = False, deduper: JobDeduper | None = None) -> AsyncIterator[list[dict]]:
+    """
+    Scrape Indeed jobs via Apify actor borderline/indeed-scraper (PPR), yielding normalized,
+    deduplicated batches as the dataset is paged (EVER_APPLY_INDEED_PAGE_SIZE items per request).
+    Callers can upsert and score a page while the next one downloads, and only one page is
+    held in memory at a time. Pass a shared `deduper` to dedup against other sources too.
+    """
     query = " ".join(keywords)
     if remote:
         query += " remote"
@@ -106,54 +179,202 @@ async def fetch_indeed_jobs(keywords: list[str], location: str = "", remote: boo
         "fromDays": "1",
         "saveOnlyUniqueJobs": True,
     }
-    run = apify.actor("borderline/indeed-scraper").call(run_input=run_input)
-    items = apify.dataset(run["defaultDatasetId"]).iterate_items()
-    jobs = [_normalize_job(item, "indeed") for item in items]
-
-    # Deduplicate by source_url OR (title, company)
-    seen_urls = set()
-    seen_title_company = set()
-    unique_jobs = []
-    for job in jobs:
-        url = job["source_url"]
-        title_company = (job["title"].lower().strip(), job["company"].lower().strip())
-
-        if (url and url in seen_urls) or title_company in seen_title_company:
-            continue
+    # The slot covers the actor run only — paging its finished dataset doesn't need one
+    async with _apify_slots:
+        run = await apify.actor("borderline/indeed-scraper").call(
+            run_input=run_input, timeout_secs=settings.EVER_APPLY_APIFY_TIMEOUT_SECONDS
+        )
+
+    dataset = apify.dataset(run["defaultDatasetId"])
+    deduper = deduper or JobDeduper()
+    offset = total = 0
+    try:
+        while True:
+            page = await dataset.list_items(offset=offset, limit=settings.EVER_APPLY_INDEED_PAGE_SIZE)
+            total = page.total
+            if not page.items:
+                break
+            offset += len(page.items)
+            batch = deduper.filter([_normalize_job(item, "indeed") for item in page.items])
+            if batch:
+                yield batch
+            if offset >= page.total:
+                break
+    finally:
+        # PPR bills every dataset item, duplicates included — record the dataset's total, not just
+        # the items paged before the caller stopped (offset only if the first page never came back)
+        recorder.record("apify", "fetch", model="borderline/indeed-scraper", results=max(total, offset))
 
-        if url:
-            seen_urls.add(url)
-        seen_title_company.add(title_company)
-        unique_jobs.append(job)
 
-    return unique_jobs
+async def fetch_indeed_jobs(keywords: list[str], location: str = "", remote: bool = False) -> list[dict]:
+    """Scrape Indeed jobs via Apify actor borderline/indeed-scraper (PPR) — the whole result set as one list."""
+    return [job async for batch in stream_indeed_jobs(keywords, location, remote=remote) for job in batch]
+
+
+# Public board APIs — Greenhouse's content=true includes each posting's description, which scoring needs
+BOARD_URLS = {
+    "greenhouse": "https://boards-api.greenhouse.io/v1/boards/{slug}/jobs?content=true",
+    "lever": "https://api.lever.co/v0/postings/{slug}?mode=json",
+}
+
+
+@dataclass
+class BoardResponse:
+    """One board download. A 304 has no postings — nothing on the board changed since `cached`."""
+    source: str
+    slug: str
+    url: str
+    not_modified: bool = False
+    postings: list[dict] = field(default_factory=list)
+    etag: str | None = None
+    last_modified: str | None = None
+
+
+async def _get_board(source: str, slug: str, cached=None) -> BoardResponse:
+    """GET a board's postings; with a `cached` BoardCache entry, as a conditional request."""
+    url = BOARD_URLS[source].format(slug=slug)
+    headers = {}
+    if cached is not None and cached.etag:
+        headers["If-None-Match"] = cached.etag
+    if cached is not None and cached.last_modified:
+        headers["If-Modified-Since"] = cached.last_modified
+    async with _board_slots[source]:
+        response = await http.get(url, headers=headers)
+    if response.status_code == 304:
+        return BoardResponse(source, slug, url, not_modified=True)
+    response.raise_for_status()
+    body = response.json()
+    return BoardResponse(
+        source,
+        slug,
+        url,
+        postings=body.get("jobs", []) if source == "greenhouse" else body,
+        etag=response.headers.get("etag"),
+        last_modified=response.headers.get("last-modified"),
+    )
 
 
 async def fetch_greenhouse_jobs(company_slug: str) -> list[dict]:
     """Fetch jobs directly from Greenhouse public API — no Apify needed."""
-    url = f"https://boards.greenhouse.io/{company_slug}/jobs.json"
-    async with httpx.AsyncClient() as client:
-        response = await client.get(url)
-        response.raise_for_status()
-        jobs = response.json().get("jobs", [])
-    return [_normalize_job(job, "greenhouse") for job in jobs]
+    board = await _get_board("greenhouse", company_slug)
+    return [_normalize_job(job, "greenhouse", company=company_slug) for job in board.postings]
 
 
 async def fetch_lever_jobs(company_slug: str) -> list[dict]:
     """Fetch jobs directly from Lever public API — no Apify needed."""
-    url = f"https://api.lever.co/v0/postings/{company_slug}?mode=json"
-    async with httpx.AsyncClient() as client:
-        response = await client.get(url)
-        response.raise_for_status()
-        jobs = response.json()
-    return [_normalize_job(job, "lever") for job in jobs]
+    board = await _get_board("lever", company_slug)
+    return [_normalize_job(job, "lever", company=company_slug) for job in board.postings]
+
+
+@dataclass
+class BoardJobs:
+    """fetch_board_jobs() result — postings to upsert, and the stored rows of postings that didn't change."""
+    jobs: list[dict] = field(default_factory=list)  # New or edited postings, normalized
+    rows: list = field(default_factory=list)        # JOB_ROW_COLUMNS rows of unchanged postings — matched, not re-upserted
+
+
+async def fetch_board_jobs() -> BoardJobs:
+    """
+    Every board in EVER_APPLY_GREENHOUSE_BOARDS / EVER_APPLY_LEVER_BOARDS, fetched concurrently
+    with conditional requests:
+
+      - The ETag/Last-Modified of the last fetch are sent back; a 304 skips the board entirely.
+      - On a 200, postings whose content hash matches the last fetch are skipped before
+        _normalize_job, so only new or edited postings are normalized and upserted.
+
+    Skipped postings are already stored — their job rows get expires_at extended and are
+    returned as `rows`, so they are still matched against this run's users. If a row is gone
+    (cleanup ran while no run did), the posting is normalized again, or for a 304 the board's
+    validators are dropped so the next run fetches it in full.
+    A board that fails or times out is logged and skipped — it never fails the run.
+    """
+    from core.database import AsyncSessionLocal
+    from apps.ever_apply.services.board_cache import load_board_cache, posting_hash, store_board_cache
+    from apps.ever_apply.services.ingest import touch_jobs
+
+    boards = [("greenhouse", slug) for slug in settings.greenhouse_boards_list]
+    boards += [("lever", slug) for slug in settings.lever_boards_list]
+    if not boards:
+        return BoardJobs()
+
+    async with AsyncSessionLocal() as db:
+        cache = await load_board_cache(db, [BOARD_URLS[source].format(slug=slug) for source, slug in boards])
+    results = await asyncio.gather(
+        *(_get_board(source, slug, cache.get(BOARD_URLS[source].format(slug=slug))) for source, slug in boards),
+        return_exceptions=True,
+    )
+
+    jobs = []
+    skipped = {}  # posting url → (board, raw posting, or None for a 304)
+    entries = {}
+    not_modified = 0
+    for (source, slug), board in zip(boards, results):
+        if isinstance(board, BaseException):
+            logger.warning(f"fetch_board_jobs: {source} board {slug!r} failed ({type(board).__name__}: {board})")
+            continue
+        cached = cache.get(board.url)
+        old_hashes = cached.posting_hashes if cached else {}
+        if board.not_modified:
+            not_modified += 1
+            skipped.update({url: (board, None) for url in old_hashes})
+            continue
+
+        hashes = {}
+        for raw in board.postings:
+            url = raw.get("absolute_url") or raw.get("hostedUrl")
+            content_hash = posting_hash(raw)
+            if url and old_hashes.get(url) == content_hash:
+                skipped[url] = (board, raw)
+            else:
+                jobs.append(_normalize_job(raw, source, company=slug))
+            if url:
+                hashes[url] = content_hash
+        entries[board.url] = {
+            "url": board.url,
+            "etag": board.etag,
+            "last_modified": board.last_modified,
+            "posting_hashes": hashes,
+        }
+
+    async with AsyncSessionLocal() as db:
+        unchanged = await touch_jobs(db, list(skipped))
+        present = {row.source_url for row in unchanged}
+        for url, (board, raw) in skipped.items():
+            if url in present:
+                continue
+            if raw is not None:
+                jobs.append(_normalize_job(raw, board.source, company=board.slug))
+            else:
+                entries[board.url] = {"url": board.url, "etag": None, "last_modified": None, "posting_hashes": {}}
+        await store_board_cache(db, list(entries.values()))
+        await db.commit()
+
+    logger.info(
+        f"fetch_board_jobs: {len(boards)} board(s), {not_modified} not modified, "
+        f"{len(present)} unchanged posting(s) skipped, {len(jobs)} new or changed"
+    )
+    return BoardJobs(jobs=jobs, rows=unchanged)
 
 
-async def fetch_all_jobs(keywords: list[str], location: str = "") -> list[dict]:
-    """Run all scrapers and return combined deduplicated job list."""
-    all_jobs = []
+async def stream_all_jobs(keywords: list[str], location: str = "", remote: bool = False, board_jobs=None) -> AsyncIterator[list[dict]]:
+    """
+    One Indeed search, page by page, then every configured Greenhouse/Lever board as a final
+    batch — boards download concurrently with the search, and batches are deduplicated across
+    sources. `board_jobs` is an optional shared fetch_board_jobs() task, so several searches in
+    one run download each board once. Only new or changed board postings are yielded — the rows
+    of unchanged ones are on the task's BoardJobs.
+    """
+    if board_jobs is None:
+        board_jobs = asyncio.create_task(fetch_board_jobs())
+    deduper = JobDeduper()
+    async for batch in stream_indeed_jobs(keywords, location, remote=remote, deduper=deduper):
+        yield batch
+    # shield — one search being cancelled mustn't cancel a board fetch other searches are waiting on
+    batch = deduper.filter((await asyncio.shield(board_jobs)).jobs)
+    if batch:
+        yield batch
 
-    # Apify scraper (Indeed)
-    all_jobs += await fetch_indeed_jobs(keywords, location)
 
-    return all_jobs
+async def fetch_all_jobs(keywords: list[str], location: str = "", remote: bool = False, board_jobs=None) -> list[dict]:
+    """stream_all_jobs() collected into one list."""
+    return [job async for batch in stream_all_jobs(keywords, location, remote=remote, board_jobs=board_jobs) for job in batch]
@@ -0,0 +1,72 @@
+"""
+Cloudflare R2 helpers shared by every path that stores or removes resume files.
+
+One boto3 client is built per process (boto3 clients are thread-safe) instead of one per call.
+delete_objects() removes any number of keys with S3 DeleteObjects — up to 1000 keys per
+request, the requests run concurrently in worker threads so the event loop never blocks.
+"""
+
+import asyncio
+import functools
+import logging
+from urllib.parse import urlparse
+import boto3
+from core.config import settings
+
+logger = logging.getLogger("ever_apply.storage")
+
+DELETE_BATCH_SIZE = 1000  # S3/R2 DeleteObjects limit per request
+DELETE_CONCURRENCY = 4    # DeleteObjects requests in flight at once (botocore pools 10 connections)
+
+
+@functools.cache
+def r2_client():
+    """The process-wide R2 client (S3-compatible — only the endpoint_url changes vs real S3)."""
+    return boto3.client(
+        "s3",
+        endpoint_url=f"https://{settings.R2_ACCOUNT_ID}.r2.cloudflarestorage.com",
+        aws_access_key_id=settings.R2_ACCESS_KEY_ID,
+        aws_secret_access_key=settings.R2_SECRET_ACCESS_KEY,
+        region_name="auto",  # Required by Cloudflare R2
+    )
+
+
+def object_key(url: str) -> str:
+    """R2 key of a stored file from its public URL."""
+    return urlparse(url).path.lstrip("/")
+
+
+def _delete_batch(client, keys: list[str]) -> list[str]:
+    """One DeleteObjects request; returns the keys R2 reported as failed."""
+    response = client.delete_objects(
+        Bucket=settings.R2_BUCKET_NAME,
+        Delete={"Objects": [{"Key": key} for key in keys], "Quiet": True},  # Quiet: only errors come back
+    )
+    for error in response.get("Errors", []):
+        logger.warning(f"storage: failed to delete {error.get('Key')}: {error.get('Code')} {error.get('Message')}")
+    return [error["Key"] for error in response.get("Errors", [])]
+
+
+async def delete_objects(keys: list[str]) -> list[str]:
+    """
+    Delete `keys` from the bucket in batches of DELETE_BATCH_SIZE, DELETE_CONCURRENCY requests at
+    a time. Missing keys count as deleted. Returns the keys that failed — a whole batch if its
+    request errored — so the caller can retry them.
+    """
+    keys = list(dict.fromkeys(keys))
+    if not keys:
+        return []
+    client = r2_client()
+    slots = asyncio.Semaphore(DELETE_CONCURRENCY)
+
+    async def _run(batch: list[str]) -> list[str]:
+        async with slots:
+            try:
+                return await asyncio.to_thread(_delete_batch, client, batch)
+            except Exception:
+                logger.exception(f"storage: DeleteObjects request for {len(batch)} key(s) failed")
+                return batch
+
+    batches = [keys[i:i + DELETE_BATCH_SIZE] for i in range(0, len(keys), DELETE_BATCH_SIZE)]
+    results = await asyncio.gather(*(_run(batch) for batch in batches))
+    return [key for failed in results for key in failed]
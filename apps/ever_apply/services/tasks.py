@@ -0,0 +1,184 @@
+import json
+from datetime import datetime, timedelta
+from sqlalchemy import and_, func, or_, select, text, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from core.config import settings
+from apps.ever_apply.models import ACTIVE_TASK_PREDICATE, Task, TaskStatus
+
+# Failed attempts are retried after 30s, 60s, 120s, ... until max_attempts
+RETRY_BASE_SECONDS = 30
+
+# pg_notify channel for task status/progress events — main.py listens, admin SSE streams filter by task_id
+TASK_CHANNEL = "everapply_tasks"
+
+# last_error is cut to this in NOTIFY payloads — Postgres rejects payloads over 8000 bytes, and
+# SQLAlchemy error text carries the whole failing statement. GET /admin/tasks/{id} has it in full
+NOTIFY_ERROR_CHARS = 1000
+
+
+def task_snapshot(task: Task) -> dict:
+    """The JSON shape of GET /admin/tasks/{id} and of every event on TASK_CHANNEL."""
+    return {
+        "task_id": str(task.id),
+        "kind": task.kind,
+        "status": task.status.value,
+        "attempts": task.attempts,
+        "progress": task.progress,
+        "result": task.result,
+        "last_error": task.last_error,
+        "created_at": task.created_at,
+        "finished_at": task.finished_at,
+    }
+
+
+async def _notify(db: AsyncSession, task_id) -> None:
+    """Publish the task's current row on TASK_CHANNEL — delivered when the caller's transaction commits."""
+    task = await db.get(Task, task_id, populate_existing=True)
+    if task is None:
+        return
+    snapshot = task_snapshot(task)
+    if snapshot["last_error"]:
+        snapshot["last_error"] = snapshot["last_error"][:NOTIFY_ERROR_CHARS]
+    payload = json.dumps(snapshot, default=str)
+    await db.execute(select(func.pg_notify(TASK_CHANNEL, payload)))
+
+
+async def enqueue(db: AsyncSession, kind: str, payload: dict | None = None, unique_key: str | None = None) -> tuple:
+    """
+    Queue a task for the workers. With a unique_key, a task already queued or running under
+    that key is reused instead — so a cron tick and an admin click can't start the same run twice.
+    Returns (task_id, created). Caller commits.
+    """
+    result = await db.execute(
+        insert(Task)
+        .values(kind=kind, payload=payload or {}, unique_key=unique_key)
+        .on_conflict_do_nothing(index_elements=[Task.unique_key], index_where=text(ACTIVE_TASK_PREDICATE))
+        .returning(Task.id)
+    )
+    task_id = result.scalar_one_or_none()
+    if task_id is not None:
+        return task_id, True
+
+    result = await db.execute(
+        select(Task.id).where(Task.unique_key == unique_key, Task.status.in_([TaskStatus.QUEUED, TaskStatus.RUNNING]))
+    )
+    return result.scalar_one(), False
+
+
+async def enqueue_once(db: AsyncSession, kind: str) -> tuple:
+    """
+    Queue a `kind` task keyed on its kind — the cron jobs and admin endpoints both go through
+    here, so at most one task per kind is queued or running. Returns (task_id, created). Commits.
+    """
+    task_id, created = await enqueue(db, kind, unique_key=kind)
+    await db.commit()
+    return task_id, created
+
+
+async def claim_task(db: AsyncSession, worker_id: str) -> Task | None:
+    """
+    Lock and take the next due task. FOR UPDATE SKIP LOCKED lets any number of workers poll
+    concurrently — each row goes to exactly one of them and nobody waits on another's lock.
+    Running tasks whose heartbeat went stale (the worker died) are picked up again. Commits.
+    """
+    now = datetime.utcnow()
+    stale_cutoff = now - timedelta(seconds=settings.EVER_APPLY_TASK_STALE_SECONDS)
+    stale = and_(Task.status == TaskStatus.RUNNING, Task.locked_at < stale_cutoff)
+
+    # Abandoned tasks that already used every attempt are given up on, not retried forever
+    await db.execute(
+        update(Task)
+        .where(stale, Task.attempts >= Task.max_attempts)
+        .values(status=TaskStatus.FAILED, last_error="worker lost", finished_at=now)
+    )
+
+    result = await db.execute(
+        select(Task)
+        .where(or_(and_(Task.status == TaskStatus.QUEUED, Task.run_at <= now), stale))
+        .order_by(Task.run_at)
+        .limit(1)
+        .with_for_update(skip_locked=True)
+    )
+    task = result.scalar_one_or_none()
+    if task is not None:
+        task.status = TaskStatus.RUNNING
+        task.locked_by = worker_id
+        task.locked_at = now
+        task.attempts += 1
+        await db.flush()
+        await _notify(db, task.id)
+    await db.commit()
+    return task
+
+
+async def heartbeat(db: AsyncSession, task_id, worker_id: str, progress: dict | None = None) -> None:
+    """
+    Keep a long-running task's lock fresh so it isn't reclaimed as stale. With `progress`,
+    also store the latest counters and publish them to SSE subscribers. Commits.
+    """
+    values = {"locked_at": datetime.utcnow()}
+    if progress is not None:
+        values["progress"] = progress
+    await db.execute(
+        update(Task)
+        .where(Task.id == task_id, Task.locked_by == worker_id, Task.status == TaskStatus.RUNNING)
+        .values(**values)
+    )
+    if progress is not None:
+        await _notify(db, task_id)
+    await db.commit()
+
+
+def _owned(task_id, worker_id: str):
+    """Still this worker's lease — a task reclaimed as stale may be running on another worker by now."""
+    return and_(Task.id == task_id, Task.locked_by == worker_id, Task.status == TaskStatus.RUNNING)
+
+
+async def complete_task(db: AsyncSession, task_id, worker_id: str, result: dict | None, progress: dict | None = None) -> bool:
+    """Mark the task DONE. Returns False, writing nothing, if the worker lost its lease. Commits."""
+    values = {"status": TaskStatus.DONE, "result": result, "finished_at": datetime.utcnow()}
+    if progress is not None:
+        values["progress"] = progress
+    updated = await db.execute(update(Task).where(_owned(task_id, worker_id)).values(**values))
+    if not updated.rowcount:
+        return False
+    await _notify(db, task_id)
+    await db.commit()
+    return True
+
+
+async def fail_task(db: AsyncSession, task: Task, worker_id: str, error: str, progress: dict | None = None) -> bool | None:
+    """
+    Requeue with exponential backoff, or mark FAILED once max_attempts is used up.
+    Returns True if the task failed for good, False if it was requeued, and None, writing
+    nothing, if the worker lost its lease. Commits.
+    """
+    now = datetime.utcnow()
+    retry = task.attempts < task.max_attempts
+    if retry:
+        values = {
+            "status": TaskStatus.QUEUED,
+            "run_at": now + timedelta(seconds=RETRY_BASE_SECONDS * 2 ** (task.attempts - 1)),
+        }
+    else:
+        values = {"status": TaskStatus.FAILED, "finished_at": now}
+    if progress is not None:
+        values["progress"] = progress
+    updated = await db.execute(update(Task).where(_owned(task.id, worker_id)).values(last_error=error, **values))
+    if not updated.rowcount:
+        return None
+    await _notify(db, task.id)
+    await db.commit()
+    return not retry
+
+
+async def release_task(db: AsyncSession, task_id, worker_id: str) -> None:
+    """Hand an interrupted task back to the queue without charging it an attempt. Commits."""
+    await db.execute(
+        update(Task)
+        .where(_owned(task_id, worker_id))
+        .values(status=TaskStatus.QUEUED, attempts=Task.attempts - 1, locked_by=None, locked_at=None)
+    )
+    await _notify(db, task_id)
+    await db.commit()
@@ -0,0 +1,98 @@
+"""
+Per-call usage telemetry — every DeepSeek completion and Apify actor run becomes one
+everapply_usage row, tagged with the feature, user, run and task it was made for.
+
+Tags come from usage_context(), a contextvar, so they reach calls deep inside the pipeline
+(and the asyncio tasks it spawns) without threading ids through every signature:
+
+    with usage_context(user_id=user.id):
+        await parse_resume(text)   # → chat_completion(feature="parse", ...) records a tagged row
+
+Rows are buffered in memory and inserted in one statement every EVER_APPLY_USAGE_FLUSH_SECONDS
+by the recorder started in main.py / the standalone worker, so metering never adds a DB
+round-trip to the call it measures. Telemetry is best-effort: a failed flush is logged and retried.
+"""
+
+import asyncio
+import logging
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+from core.config import settings
+
+logger = logging.getLogger("ever_apply.usage")
+
+# Rows kept in memory while the DB is unreachable — beyond this, the oldest are dropped
+MAX_BUFFERED = 10_000
+
+_tags: ContextVar[dict] = ContextVar("everapply_usage_tags", default={})
+
+
+@contextmanager
+def usage_context(**tags):
+    """Tag every usage event recorded inside the block (user_id, run_id, task_id)."""
+    token = _tags.set({**_tags.get(), **tags})
+    try:
+        yield
+    finally:
+        _tags.reset(token)
+
+
+class UsageRecorder:
+    def __init__(self) -> None:
+        self._buffer: list[dict] = []
+        self._task: asyncio.Task | None = None
+
+    def record(self, provider: str, feature: str, **counts) -> None:
+        """Buffer one event; `counts` are UsageEvent columns (model, prompt_tokens, results, ...)."""
+        tags = _tags.get()
+        self._buffer.append({
+            "created_at": datetime.utcnow(),
+            "provider": provider,
+            "feature": feature,
+            "user_id": tags.get("user_id"),
+            "run_id": tags.get("run_id"),
+            "task_id": tags.get("task_id"),
+            "model": None,
+            "prompt_tokens": 0,
+            "completion_tokens": 0,
+            "cache_hit_tokens": 0,
+            "cache_miss_tokens": 0,
+            "results": 0,
+            **counts,
+        })
+
+    async def flush(self) -> None:
+        from sqlalchemy import insert
+        from core.database import AsyncSessionLocal
+        from apps.ever_apply.models import UsageEvent
+
+        if not self._buffer:
+            return
+        rows, self._buffer = self._buffer, []
+        try:
+            async with AsyncSessionLocal() as db:
+                await db.execute(insert(UsageEvent), rows)
+                await db.commit()
+        except Exception:
+            logger.exception(f"usage: failed to write {len(rows)} event(s), will retry")
+            self._buffer = (rows + self._buffer)[-MAX_BUFFERED:]
+
+    async def start(self) -> None:
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the flush loop and write whatever is still buffered."""
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        await self.flush()
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(settings.EVER_APPLY_USAGE_FLUSH_SECONDS)
+            await self.flush()
+
+
+recorder = UsageRecorder()
@@ -0,0 +1,161 @@
+"""
+Task worker — drains the everapply_tasks queue.
+
+Cron jobs and the admin endpoints only enqueue tasks; workers claim them with
+SELECT ... FOR UPDATE SKIP LOCKED, so any number can run side by side without double work.
+
+Standalone (one or more processes/replicas):
+    python -m apps.ever_apply.worker --concurrency 2
+
+The web process also runs EVER_APPLY_EMBEDDED_WORKERS loops from its lifespan so a
+single-process deploy keeps working. Set it to 0 once standalone workers are deployed
+to keep multi-minute scoring runs off the web tier.
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import signal
+import socket
+from core.config import settings
+from apps.ever_apply.scheduler import cleanup_job, fetch_and_score, score_existing_jobs
+from apps.ever_apply.services.engine import RunStats
+from apps.ever_apply.services.usage import recorder, usage_context
+
+logger = logging.getLogger("ever_apply.worker")
+
+# Task kind → coroutine function. The task payload is passed as keyword arguments, plus
+# `stats`: a RunStats the handler updates and the worker publishes as live progress
+TASK_HANDLERS = {
+    "fetch_and_score": fetch_and_score,
+    "score_jobs": score_existing_jobs,
+    "cleanup_jobs": cleanup_job,
+}
+
+
+class TaskWorker:
+    def __init__(self, concurrency: int = 1) -> None:
+        self.concurrency = concurrency
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}"
+        self._loops: list[asyncio.Task] = []
+
+    async def start(self) -> None:
+        self._loops = [
+            asyncio.create_task(self._run(f"{self.worker_id}:{i}")) for i in range(self.concurrency)
+        ]
+        logger.info(f"worker {self.worker_id}: started {self.concurrency} loop(s)")
+
+    async def stop(self) -> None:
+        """Cancel the loops — a task in progress is released back to the queue."""
+        for loop in self._loops:
+            loop.cancel()
+        await asyncio.gather(*self._loops, return_exceptions=True)
+        self._loops = []
+
+    async def _run(self, worker_id: str) -> None:
+        from core.database import AsyncSessionLocal
+        from apps.ever_apply.services.tasks import claim_task
+
+        while True:
+            try:
+                async with AsyncSessionLocal() as db:
+                    task = await claim_task(db, worker_id)
+            except Exception:
+                logger.exception(f"worker {worker_id}: failed to claim a task")
+                task = None
+
+            if task is None:
+                await asyncio.sleep(settings.EVER_APPLY_WORKER_POLL_SECONDS)
+                continue
+            try:
+                await self._execute(task, worker_id)
+            except Exception:
+                # Recording the outcome failed (DB blip, NOTIFY error) — the loop must outlive it;
+                # a task left RUNNING is reclaimed once its heartbeat goes stale
+                logger.exception(f"worker {worker_id}: failed to record the outcome of {task.kind} task {task.id}")
+
+    async def _execute(self, task, worker_id: str) -> None:
+        from core.database import AsyncSessionLocal
+        from apps.ever_apply.models import RunStatus
+        from apps.ever_apply.services.runs import finish_run
+        from apps.ever_apply.services.tasks import complete_task, fail_task, release_task
+
+        logger.info(f"worker {worker_id}: running {task.kind} task {task.id} (attempt {task.attempts})")
+        stats = RunStats()
+        beat = asyncio.create_task(self._heartbeat(task.id, worker_id, stats))
+        try:
+            handler = TASK_HANDLERS.get(task.kind)
+            if handler is None:
+                raise LookupError(f"unknown task kind {task.kind!r}")
+            # Usage events recorded by the handler carry the task id (fetch_and_score adds its run id)
+            with usage_context(task_id=task.id):
+                result = await handler(**(task.payload or {}), stats=stats)
+        except asyncio.CancelledError:
+            # Shutdown/redeploy — hand the task straight back instead of waiting for it to go stale
+            try:
+                async with AsyncSessionLocal() as db:
+                    await release_task(db, task.id, worker_id)
+            except Exception:
+                logger.exception(f"worker {worker_id}: failed to release task {task.id}")
+            raise
+        except Exception as e:
+            logger.exception(f"worker {worker_id}: {task.kind} task {task.id} failed")
+            async with AsyncSessionLocal() as db:
+                final = await fail_task(db, task, worker_id, f"{type(e).__name__}: {e}", progress=stats.summary())
+                if final is None:
+                    logger.warning(f"worker {worker_id}: lost the lease on task {task.id} — its failure is not recorded")
+                elif final and stats.run_id is not None:
+                    # No retry left to resume the run — close it, or the next cron tick would resume
+                    # it and skip every user it already finished instead of fetching fresh jobs
+                    await finish_run(db, stats.run_id, stats.summary(), RunStatus.FAILED)
+        else:
+            async with AsyncSessionLocal() as db:
+                completed = await complete_task(db, task.id, worker_id, result, progress=stats.summary())
+            if completed:
+                logger.info(f"worker {worker_id}: {task.kind} task {task.id} done")
+            else:
+                logger.warning(f"worker {worker_id}: lost the lease on task {task.id} — another worker owns it now")
+        finally:
+            beat.cancel()
+
+    async def _heartbeat(self, task_id, worker_id: str, stats: RunStats) -> None:
+        """Refresh the task's lock and publish its counters until the task finishes."""
+        from core.database import AsyncSessionLocal
+        from apps.ever_apply.services.tasks import heartbeat
+
+        while True:
+            await asyncio.sleep(settings.EVER_APPLY_PROGRESS_SECONDS)
+            try:
+                async with AsyncSessionLocal() as db:
+                    await heartbeat(db, task_id, worker_id, progress=stats.summary())
+            except Exception:
+                logger.warning(f"worker {worker_id}: heartbeat failed for task {task_id}")
+
+
+async def _main(concurrency: int) -> None:
+    from core.database import engine
+    from apps.ever_apply.services.scraper import http as board_http
+
+    worker = TaskWorker(concurrency)
+    stopping = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stopping.set)
+
+    await recorder.start()
+    await worker.start()
+    await stopping.wait()
+    logger.info(f"worker {worker.worker_id}: shutting down")
+    await worker.stop()
+    await recorder.stop()
+    await board_http.aclose()
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Drain the Ever Apply task queue.")
+    parser.add_argument("--concurrency", type=int, default=1, help="tasks this process runs at once")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    asyncio.run(_main(args.concurrency))
@@ -18,6 +18,11 @@ class Settings(BaseSettings):
     CLERK_JWKS_URL: str              # From Clerk Dashboard → API Keys
     DEEPSEEK_API_KEY: str            # From DeepSeek Platform → API Keys
     DEEPSEEK_BASE_URL: str = "https://api.deepseek.com"
+    DEEPSEEK_TIMEOUT_SECONDS: float = 60.0       # Per-request timeout for DeepSeek calls
+    DEEPSEEK_MAX_ATTEMPTS: int = 4               # Tries per DeepSeek call on 429/5xx/timeouts
+    DEEPSEEK_INITIAL_CONCURRENCY: int = 8        # Adaptive limiter starting point (per process)
+    DEEPSEEK_MAX_CONCURRENCY: int = 32           # Adaptive limiter ceiling (per process)
+    DEEPSEEK_LATENCY_TARGET_SECONDS: float = 30.0  # Slower successful calls count as congestion
     APIFY_API_TOKEN: str
     R2_ACCOUNT_ID: str               # Cloudflare Account ID
     R2_ACCESS_KEY_ID: str            # R2 API Token → Access Key ID
@@ -28,12 +33,35 @@ class Settings(BaseSettings):
     CLERK_WEBHOOK_SECRET: str = ""   # Clerk Dashboard → Webhooks → signing secret
     EVER_APPLY_MAX_JOBS: int = 50             # Max jobs to fetch per Apify run
     EVER_APPLY_SCHEDULER_ENABLED: bool = True  # Set to false to disable cron jobs
+    EVER_APPLY_LEADER_RETRY_SECONDS: int = 15  # How often followers try to take over scheduler leadership
+    EVER_APPLY_EMBEDDED_WORKERS: int = 1      # Task workers run inside the web process (0 = standalone workers only)
+    EVER_APPLY_WORKER_POLL_SECONDS: float = 2.0  # Idle workers check the task queue this often
+    EVER_APPLY_TASK_STALE_SECONDS: int = 300  # A running task with no heartbeat for this long is reclaimed
+    EVER_APPLY_PROGRESS_SECONDS: float = 2.0  # Running tasks publish heartbeat + progress this often
+    EVER_APPLY_USER_CONCURRENCY: int = 4      # Users fetched + scored in parallel per run
+    EVER_APPLY_SCORING_CONCURRENCY: int = 8   # Max in-flight DeepSeek scoring calls per run
+    EVER_APPLY_APIFY_CONCURRENCY: int = 3     # Max concurrent Apify actor runs per process
+    EVER_APPLY_APIFY_TIMEOUT_SECONDS: int = 600  # Apify aborts an Indeed actor run after this long
+    EVER_APPLY_INDEED_PAGE_SIZE: int = 25     # Dataset items per page — each page is upserted + scored as it arrives
+    EVER_APPLY_GREENHOUSE_BOARDS: str = ""    # Comma-separated Greenhouse board slugs fetched every run (free)
+    EVER_APPLY_LEVER_BOARDS: str = ""         # Comma-separated Lever company slugs fetched every run (free)
+    EVER_APPLY_BOARD_CONCURRENCY: int = 8     # Concurrent board requests per source (Greenhouse, Lever)
+    EVER_APPLY_BOARD_TIMEOUT_SECONDS: float = 20.0  # Per-request timeout for Greenhouse/Lever board fetches
+    EVER_APPLY_CLEANUP_CHUNK_SIZE: int = 1000  # Expired jobs deleted (and committed) per cleanup statement
+    EVER_APPLY_SCORE_CACHE_DAYS: int = 14     # Cached scores older than this are pruned by cleanup-jobs
+    EVER_APPLY_RUN_RESUME_HOURS: int = 3      # Interrupted runs younger than this are resumed, older ones abandoned
+    EVER_APPLY_SCORING_BATCH_SIZE: int = 5    # Jobs scored per DeepSeek completion (1 = one job per call)
+    EVER_APPLY_PREFILTER_MIN_OVERLAP: int = 1  # Resume skills/titles a job must mention to reach DeepSeek (0 = off)
     EVER_APPLY_PRICE: int = 40                # Monthly subscription price in USD
     EVER_APPLY_APIFY_PPR: float = 5.0         # Apify price per 1,000 results (PPR)
     EVER_APPLY_DEEPSEEK_COST: float = 1.47    # Estimated DeepSeek cost per active user/month
                                                # Based on: 6000 jobs x 800 input tokens x $0.28/1M
                                                #         + 6000 jobs x 50 output tokens x $0.42/1M
                                                # Update if pricing changes: platform.deepseek.com/docs/pricing
+    DEEPSEEK_PRICE_CACHE_MISS: float = 0.28   # USD per 1M input tokens (cache miss) — used by usage_report.py --actual
+    DEEPSEEK_PRICE_CACHE_HIT: float = 0.028   # USD per 1M input tokens served from DeepSeek's context cache
+    DEEPSEEK_PRICE_OUTPUT: float = 0.42       # USD per 1M output tokens
+    EVER_APPLY_USAGE_FLUSH_SECONDS: float = 10.0  # Buffered usage events are written this often
     EVER_APPLY_TRIAL_DAYS: int = 7            # Free trial length in days
     ATS_DAILY_LIMIT_DEFAULT: int = 5          # Match-based ATS limit: trial users
     ATS_DAILY_LIMIT_PAID: int = 15            # Match-based ATS limit: paid users
@@ -42,6 +70,14 @@ class Settings(BaseSettings):
     ATS_TARGETED_LIMIT_PAID: int = 10         # Targeted ATS limit: paid users
     ATS_TARGETED_LIMIT_WHITELISTED: int = 20  # Targeted ATS limit: whitelisted users
 
+    @property
+    def greenhouse_boards_list(self) -> list[str]:
+        return [slug.strip() for slug in self.EVER_APPLY_GREENHOUSE_BOARDS.split(",") if slug.strip()]
+
+    @property
+    def lever_boards_list(self) -> list[str]:
+        return [slug.strip() for slug in self.EVER_APPLY_LEVER_BOARDS.split(",") if slug.strip()]
+
     class Config:
         env_file = ".env"
         env_file_encoding = "utf-8"
@@ -0,0 +1,90 @@
+"""
+PostgreSQL advisory-lock leader election.
+
+How it works:
+  1. Every process creates a LeaderElection for the same name and calls start().
+  2. Each one opens a raw asyncpg connection (separate from the SQLAlchemy pool) and
+     calls pg_try_advisory_lock(<key derived from name>). Exactly one process gets it.
+  3. The lock is session-level: it lives as long as the leader's connection. If the leader
+     dies or its connection drops, Postgres releases the lock and the next follower poll
+     (every retry_interval seconds) takes over.
+  4. The leader pings its connection on the same interval and steps down if it fails.
+
+Guard work that must run once per cluster with `if election.is_leader:`.
+"""
+
+import asyncio
+import hashlib
+import logging
+from typing import Callable
+
+import asyncpg
+
+from core.config import settings
+
+logger = logging.getLogger("core.leader")
+
+
+class LeaderElection:
+    def __init__(self, name: str, retry_interval: float = 15.0, on_elected: Callable[[], None] | None = None) -> None:
+        self.name = name
+        # pg advisory locks take a bigint — derive a stable one from the name
+        self.key = int.from_bytes(hashlib.sha256(name.encode()).digest()[:8], "big", signed=True)
+        self.retry_interval = retry_interval
+        self.on_elected = on_elected
+        self.is_leader = False
+        self._conn: asyncpg.Connection | None = None
+        self._task: asyncio.Task | None = None
+
+    async def start(self) -> None:
+        """Try once right away (so startup work sees the result), then keep polling in the background."""
+        await self._poll()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop polling and release leadership so a follower can take over immediately."""
+        if self._task:
+            self._task.cancel()
+            self._task = None
+        if self._conn and not self._conn.is_closed():
+            if self.is_leader:
+                try:
+                    await self._conn.execute("SELECT pg_advisory_unlock($1)", self.key)
+                except Exception:
+                    logger.exception(f"leader {self.name}: failed to release lock")
+            await self._conn.close()
+        self._conn = None
+        self.is_leader = False
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.retry_interval)
+            await self._poll()
+
+    async def _poll(self) -> None:
+        try:
+            if self._conn is None or self._conn.is_closed():
+                # asyncpg needs postgresql://, strip +asyncpg if present (handles both Railway and local URLs)
+                raw_dsn = settings.DATABASE_URL.replace("postgresql+asyncpg://", "postgresql://")
+                self._conn = await asyncpg.connect(raw_dsn)
+                self.is_leader = False
+
+            if self.is_leader:
+                # Liveness check — if the connection is gone, so is the lock
+                await self._conn.fetchval("SELECT 1")
+                return
+
+            if await self._conn.fetchval("SELECT pg_try_advisory_lock($1)", self.key):
+                self.is_leader = True
+                logger.info(f"leader {self.name}: elected")
+                if self.on_elected:
+                    self.on_elected()
+        except Exception:
+            if self.is_leader:
+                logger.warning(f"leader {self.name}: lost connection, stepping down")
+            else:
+                logger.exception(f"leader {self.name}: election attempt failed")
+            self.is_leader = False
+            if self._conn and not self._conn.is_closed():
+                self._conn.terminate()
+            self._conn = None
@@ -4,7 +4,8 @@ PostgreSQL LISTEN/NOTIFY realtime manager + SSE helper.
 How it works:
   1. RealtimeManager opens a raw asyncpg connection (separate from SQLAlchemy pool).
   2. It calls LISTEN on a channel name, e.g. "app_one_updates".
-  3. sse_generator() polls that connection and yields SSE-formatted strings.
+  3. Every sse_generator() call subscribes its own queue, so each connected client
+     receives every notification (optionally filtered), then yields SSE-formatted strings.
   4. FastAPI's StreamingResponse streams those strings to the browser.
 
 How to send notifications from PostgreSQL:
@@ -25,6 +26,8 @@ How to send notifications from PostgreSQL:
 """
 
 import asyncio
+from typing import Callable
+
 import asyncpg
 
 from core.config import settings
@@ -39,8 +42,8 @@ class RealtimeManager:
     def __init__(self) -> None:
         # Maps channel name -> asyncpg Connection
         self._connections: dict[str, asyncpg.Connection] = {}
-        # Maps channel name -> asyncio.Queue of incoming notification payloads
-        self._queues: dict[str, asyncio.Queue] = {}
+        # Maps channel name -> one asyncio.Queue per connected SSE client
+        self._subscribers: dict[str, set[asyncio.Queue]] = {}
 
     async def listen(self, channel: str) -> None:
         """Open a dedicated asyncpg connection and start listening on `channel`."""
@@ -48,48 +51,58 @@ class RealtimeManager:
         # asyncpg needs postgresql://, strip +asyncpg if present (handles both Railway and local URLs)
         raw_dsn = settings.DATABASE_URL.replace("postgresql+asyncpg://", "postgresql://")
         conn = await asyncpg.connect(raw_dsn)
-        queue: asyncio.Queue = asyncio.Queue()
+        subscribers: set[asyncio.Queue] = set()
 
         def _on_notify(conn, pid, channel, payload):
-            # Called by asyncpg on each NOTIFY; enqueue the payload for SSE consumers
-            queue.put_nowait(payload)
+            # Called by asyncpg on each NOTIFY; fan the payload out to every SSE consumer
+            for queue in subscribers:
+                queue.put_nowait(payload)
 
         await conn.add_listener(channel, _on_notify)
         self._connections[channel] = conn
-        self._queues[channel] = queue
+        self._subscribers[channel] = subscribers
 
     async def unlisten(self, channel: str) -> None:
         """Stop listening and close the connection for `channel`."""
         conn = self._connections.pop(channel, None)
         if conn:
             await conn.close()
-        self._queues.pop(channel, None)
+        self._subscribers.pop(channel, None)
 
-    async def sse_generator(self, channel: str):
+    async def sse_generator(self, channel: str, match: Callable[[str], bool] | None = None):
         """
         Async generator that yields SSE-formatted strings for a given channel.
         Mount this as a StreamingResponse in your route handler.
+        Pass `match` to only forward payloads it returns True for (e.g. one run's events).
+        The client is subscribed once the `connected` event has been yielded.
 
         SSE wire format:
             data: <payload>\n\n
         """
-        queue = self._queues.get(channel)
-        if queue is None:
+        subscribers = self._subscribers.get(channel)
+        if subscribers is None:
             # Channel not registered — send one error event then stop
             yield f"event: error\ndata: channel '{channel}' is not active\n\n"
             return
 
-        # Send an initial connection event so the browser knows it's live
-        yield f"event: connected\ndata: listening on {channel}\n\n"
-
-        while True:
-            # Wait for the next notification (poll every second to stay alive)
-            try:
-                payload = await asyncio.wait_for(queue.get(), timeout=1.0)
-                yield f"data: {payload}\n\n"
-            except asyncio.TimeoutError:
-                # Heartbeat comment to keep the connection open through proxies
-                yield ": heartbeat\n\n"
+        queue: asyncio.Queue = asyncio.Queue()
+        subscribers.add(queue)
+        try:
+            # Send an initial connection event so the browser knows it's live
+            yield f"event: connected\ndata: listening on {channel}\n\n"
+
+            while True:
+                # Wait for the next notification (poll every second to stay alive)
+                try:
+                    payload = await asyncio.wait_for(queue.get(), timeout=1.0)
+                    if match is None or match(payload):
+                        yield f"data: {payload}\n\n"
+                except asyncio.TimeoutError:
+                    # Heartbeat comment to keep the connection open through proxies
+                    yield ": heartbeat\n\n"
+        finally:
+            # Client disconnected — stop buffering notifications for it
+            subscribers.discard(queue)
 
 
 # Module-level singleton — imported by main.py and route handlers
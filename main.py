@@ -17,7 +17,11 @@ from core.security import verify_api_key
 from apps.app_one.routes import router as app_one_router
 from apps.blog_demo.routes import router as blog_demo_router
 from apps.ever_apply.routes import router as ever_apply_router
-from apps.ever_apply.scheduler import scheduler
+from apps.ever_apply.scheduler import leader as scheduler_leader, scheduler
+from apps.ever_apply.services.scraper import http as board_http
+from apps.ever_apply.services.tasks import TASK_CHANNEL
+from apps.ever_apply.services.usage import recorder as usage_recorder
+from apps.ever_apply.worker import TaskWorker
 
 from apps.app_one.admin import ItemAdmin
 from apps.blog_demo.admin import CategoryAdmin, PostAdmin
@@ -29,17 +33,31 @@ async def lifespan(app: FastAPI):
     # --- Startup ---
     # Tables are managed by Alembic
     # Start listening on each app's PostgreSQL channel
-    # app_one does not use realtime — only blog_demo listens
+    # app_one does not use realtime — blog_demo listens, ever_apply streams task progress
     await realtime.listen("blog_updates")
+    await realtime.listen(TASK_CHANNEL)
+    # Buffered DeepSeek/Apify usage events — flushed periodically and on shutdown
+    await usage_recorder.start()
     if settings.EVER_APPLY_SCHEDULER_ENABLED:
+        # Every worker/replica runs the scheduler; only the advisory-lock leader executes its jobs
+        await scheduler_leader.start()
         scheduler.start()
+    # Drains the task queue in-process — set EVER_APPLY_EMBEDDED_WORKERS=0 when standalone workers run
+    embedded_worker = TaskWorker(settings.EVER_APPLY_EMBEDDED_WORKERS)
+    if settings.EVER_APPLY_EMBEDDED_WORKERS > 0:
+        await embedded_worker.start()
 
     yield
 
     # --- Shutdown ---
     await realtime.unlisten("blog_updates")
+    await realtime.unlisten(TASK_CHANNEL)
+    await embedded_worker.stop()
     if settings.EVER_APPLY_SCHEDULER_ENABLED:
         scheduler.shutdown()
+        await scheduler_leader.stop()
+    await usage_recorder.stop()
+    await board_http.aclose()
     await engine.dispose()
 
 
@@ -0,0 +1,124 @@
+"""
+EverApply — keyword matcher micro-benchmark
+Run: python scripts/bench_keywords.py [--limit 2000] [--repeat 5]     (Indeed jobs from everapply_jobs)
+     python scripts/bench_keywords.py --file dataset.json              (an exported Apify Indeed dataset)
+
+Times clearance + remote detection per description three ways — the per-keyword `in` scans
+services/keywords.py replaced, a single compiled alternation regex, and keywords.classify() —
+and checks all three agree on every description.
+"""
+import argparse
+import asyncio
+import json
+import re
+import sys
+import time
+from pathlib import Path
+
+# Allow imports from project root
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from dotenv import load_dotenv
+load_dotenv()
+
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy import select
+
+from apps.ever_apply.models import Job
+from apps.ever_apply.services.keywords import CLEARANCE_KEYWORDS, KEYWORD_FAMILIES, classify, remote_type_from
+from core.config import settings
+
+
+async def load_corpus_from_db(limit: int) -> list[tuple[str, str]]:
+    engine = create_async_engine(settings.DATABASE_URL)
+    async_session = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    async with async_session() as db:
+        result = await db.execute(
+            select(Job.title, Job.description).where(Job.source == "indeed", Job.description != "").limit(limit)
+        )
+        corpus = [(title, description) for title, description in result.all()]
+    await engine.dispose()
+    return corpus
+
+
+def load_corpus_from_file(path: str) -> list[tuple[str, str]]:
+    with open(path) as f:
+        items = json.load(f)
+    corpus = []
+    for raw in items:
+        description = raw.get("description") or raw.get("jobDescription") or raw.get("descriptionText") or ""
+        if description:
+            corpus.append((raw.get("title") or raw.get("jobTitle") or "", description))
+    return corpus
+
+
+# --- The three implementations: (title, description) → (requires_clearance, remote_type) ---
+
+def legacy(title: str, description: str) -> tuple[bool, str | None]:
+    clearance = any(kw in description.lower() for kw in CLEARANCE_KEYWORDS)
+    title = title.lower()
+    text = f"{title} {description.lower()}"
+    if "remote-first" in text or "fully remote" in text or "100% remote" in text or "work from anywhere" in text or "work from home" in text:
+        remote_type = "remote"
+    elif "remote" in title:
+        remote_type = "remote"
+    elif "hybrid" in text:
+        remote_type = "hybrid"
+    else:
+        remote_type = None
+    return clearance, remote_type
+
+
+_FAMILY_OF = {kw: family for family, keywords in KEYWORD_FAMILIES.items() for kw in keywords}
+_ALTERNATION = re.compile("|".join(re.escape(kw) for kw in sorted(_FAMILY_OF, key=len, reverse=True)))
+
+
+def alternation(title: str, description: str) -> tuple[bool, str | None]:
+    # One finditer pass over the description; the title is short and checked on its own
+    found = {_FAMILY_OF[match.group()] for match in _ALTERNATION.finditer(description.lower())}
+    title = title.lower()
+    title_found = {_FAMILY_OF[match.group()] for match in _ALTERNATION.finditer(title)}
+    if "remote" in found or "remote" in title:
+        return "clearance" in found, "remote"
+    return "clearance" in found, "hybrid" if "hybrid" in found | title_found else None
+
+
+def matcher(title: str, description: str) -> tuple[bool, str | None]:
+    # As the scraper does it — one classify() of the description feeds both checks
+    found = classify(description)
+    return "clearance" in found, remote_type_from(title, found)
+
+
+def bench(corpus: list[tuple[str, str]], repeat: int) -> None:
+    implementations = {"legacy in-scans": legacy, "regex alternation": alternation, "keywords.classify": matcher}
+    expected = [legacy(title, description) for title, description in corpus]
+    for name, fn in implementations.items():
+        mismatches = sum(1 for (title, description), want in zip(corpus, expected) if fn(title, description) != want)
+        best = float("inf")
+        for _ in range(repeat):
+            start = time.perf_counter()
+            for title, description in corpus:
+                fn(title, description)
+            best = min(best, time.perf_counter() - start)
+        print(f"{name:<20}{best / len(corpus) * 1e6:>10.1f} µs/job{best * 1000:>10.1f} ms total   {mismatches} mismatch(es)")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Benchmark clearance/remote keyword detection.")
+    parser.add_argument("--file", help="JSON list of Apify Indeed dataset items (default: read everapply_jobs)")
+    parser.add_argument("--limit", type=int, default=2000, help="jobs to load from the database (default 2000)")
+    parser.add_argument("--repeat", type=int, default=5, help="timing runs per implementation; the best is reported")
+    args = parser.parse_args()
+
+    corpus = load_corpus_from_file(args.file) if args.file else await load_corpus_from_db(args.limit)
+    if not corpus:
+        print("No descriptions to benchmark.")
+        return
+    avg_chars = sum(len(description) for _, description in corpus) // len(corpus)
+    print(f"{len(corpus)} descriptions, {avg_chars} chars on average\n")
+    bench(corpus, args.repeat)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
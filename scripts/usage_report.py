@@ -1,7 +1,9 @@
 """
 EverApply — Usage Report
-Run: python scripts/usage_report.py
+Run: python scripts/usage_report.py                  (estimated costs from user counts)
+     python scripts/usage_report.py --actual [--days 30]   (measured costs from everapply_usage)
 """
+import argparse
 import asyncio
 import sys
 from datetime import datetime, timedelta
@@ -15,9 +17,9 @@ load_dotenv()
 
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from sqlalchemy.orm import sessionmaker
-from sqlalchemy import select
+from sqlalchemy import cast, Date, func, select
 
-from apps.ever_apply.models import User
+from apps.ever_apply.models import Run, UsageEvent, User
 from core.config import settings
 
 # Scraper runs 2x/day on weekdays, 1x/day on weekends
@@ -108,7 +110,110 @@ def run_report(users: list, apify_balance: float, deepseek_balance: float):
     print()
 
 
+# --- Actual usage (--actual) ---
+
+# Per-event cost in USD, computed in SQL so every grouping below can sum and sort by it.
+# Prompt tokens not reported as cache hits are billed at the cache-miss rate.
+EVENT_COST = (
+    (UsageEvent.prompt_tokens - UsageEvent.cache_hit_tokens) * settings.DEEPSEEK_PRICE_CACHE_MISS / 1_000_000
+    + UsageEvent.cache_hit_tokens * settings.DEEPSEEK_PRICE_CACHE_HIT / 1_000_000
+    + UsageEvent.completion_tokens * settings.DEEPSEEK_PRICE_OUTPUT / 1_000_000
+    + UsageEvent.results * settings.EVER_APPLY_APIFY_PPR / 1000
+)
+TOP_N = 10
+
+
+async def fetch_actual_usage(days: int) -> dict:
+    since = datetime.utcnow() - timedelta(days=days)
+    cost = func.sum(EVENT_COST).label("usd")
+    in_window = UsageEvent.created_at >= since
+
+    by_feature = (
+        select(
+            UsageEvent.provider,
+            UsageEvent.feature,
+            func.count().label("calls"),
+            func.sum(UsageEvent.prompt_tokens).label("prompt_tokens"),
+            func.sum(UsageEvent.cache_hit_tokens).label("cache_hit_tokens"),
+            func.sum(UsageEvent.completion_tokens).label("completion_tokens"),
+            func.sum(UsageEvent.results).label("results"),
+            cost,
+        )
+        .where(in_window)
+        .group_by(UsageEvent.provider, UsageEvent.feature)
+        .order_by(cost.desc())
+    )
+    by_user = (
+        select(UsageEvent.user_id, User.email, func.count().label("calls"), cost)
+        .outerjoin(User, User.id == UsageEvent.user_id)
+        .where(in_window, UsageEvent.user_id.is_not(None))
+        .group_by(UsageEvent.user_id, User.email)
+        .order_by(cost.desc())
+        .limit(TOP_N)
+    )
+    by_run = (
+        select(UsageEvent.run_id, Run.kind, Run.started_at.label("started"), func.count().label("calls"), cost)
+        .outerjoin(Run, Run.id == UsageEvent.run_id)
+        .where(in_window, UsageEvent.run_id.is_not(None))
+        .group_by(UsageEvent.run_id, Run.kind, Run.started_at)
+        .order_by(cost.desc())
+        .limit(TOP_N)
+    )
+    day = cast(UsageEvent.created_at, Date)
+    by_day = select(day.label("day"), cost).where(in_window).group_by(day).order_by(day)
+
+    engine = create_async_engine(settings.DATABASE_URL)
+    async_session = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    async with async_session() as db:
+        usage = {name: (await db.execute(query)).all() for name, query in (
+            ("by_feature", by_feature), ("by_user", by_user), ("by_run", by_run), ("by_day", by_day),
+        )}
+    await engine.dispose()
+    return usage
+
+
+def run_actual_report(usage: dict, days: int):
+    today = datetime.utcnow().strftime("%Y-%m-%d")
+    total = sum(row.usd or 0 for row in usage["by_feature"])
+
+    print()
+    print(f"EverApply — Actual Usage, last {days} days ({today})")
+    print("=" * 78)
+    print(f"{'Provider':<10}{'Feature':<11}{'Calls':>7}{'Prompt tok':>12}{'Cache hit':>10}{'Output tok':>12}{'Results':>9}{'USD':>9}")
+    for row in usage["by_feature"]:
+        hit_rate = row.cache_hit_tokens / row.prompt_tokens if row.prompt_tokens else 0
+        print(
+            f"{row.provider:<10}{row.feature:<11}{row.calls:>7}{row.prompt_tokens:>12}{hit_rate:>9.0%} "
+            f"{row.completion_tokens:>12}{row.results:>9}{row.usd or 0:>9.2f}"
+        )
+    print(f"Total: ${total:.2f}  (~${total / days * DAYS_PER_MONTH:.2f}/month at this rate)")
+    print()
+    print(f"Top {TOP_N} users by cost")
+    for row in usage["by_user"]:
+        print(f"  {row.email or row.user_id!s:<40}{row.calls:>7} calls  ${row.usd or 0:>7.2f}")
+    print()
+    print(f"Top {TOP_N} runs by cost")
+    for row in usage["by_run"]:
+        # A run whose row is gone still has its usage — no kind or start time to show for it
+        started = f"{row.started:%Y-%m-%d %H:%M}" if row.started else "-"
+        print(f"  {row.run_id!s:<38}{row.kind or '-':<17}{started:<17}{row.calls:>7} calls  ${row.usd or 0:>7.2f}")
+    print()
+    print("Daily cost")
+    for row in usage["by_day"]:
+        print(f"  {row.day}  ${row.usd or 0:>7.2f}")
+    print()
+
+
 async def main():
+    parser = argparse.ArgumentParser(description="EverApply usage and cost report.")
+    parser.add_argument("--actual", action="store_true", help="aggregate measured usage from everapply_usage")
+    parser.add_argument("--days", type=int, default=30, help="window for --actual (default 30)")
+    args = parser.parse_args()
+
+    if args.actual:
+        run_actual_report(await fetch_actual_usage(args.days), args.days)
+        return
+
     print("\nFetching users from database...")
     users = await fetch_users()
 
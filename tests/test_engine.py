@@ -0,0 +1,53 @@
+import asyncio
+from types import SimpleNamespace
+from apps.ever_apply.services.dedup import MatchIndex
+from apps.ever_apply.services.engine import MatchEngine, RunStats, UserContext, dedup_stage, filter_stage
+
+
+def _ctx(**prefs) -> UserContext:
+    return UserContext(user_id="user", parsed_data={}, prefs=prefs, summary="Backend engineer", resume_context="")
+
+
+def _job(job_id: str, remote_type: str | None, title: str = "Engineer") -> SimpleNamespace:
+    return SimpleNamespace(
+        id=job_id, remote_type=remote_type, location=None, description="Python", description_length=6,
+        requires_clearance=False, canonical_job_id=None, title=title, company="Acme",
+    )
+
+
+def test_match_user_runs_a_custom_stage_sequence():
+    seen = []
+
+    async def collect_stage(engine, db, ctx, batch, counts):
+        counts["in"] = counts["out"] = len(batch.rows)
+        seen.extend(job.id for job in batch.rows)
+        batch.results = [(job, {"score": 50}) for job in batch.rows]
+
+    stats = RunStats()
+    engine = MatchEngine(stats, stages=(("filter", filter_stage), ("collect", collect_stage)))
+    rows = [_job("remote", "remote"), _job("onsite", "onsite"), _job("unknown", None)]
+
+    created = asyncio.run(engine.match_user(None, _ctx(remote_type="remote"), rows))
+
+    assert created == 2
+    assert seen == ["remote", "unknown"]
+    assert (stats.stages["filter"].items_in, stats.stages["filter"].items_out) == (3, 2)
+    assert stats.stages["collect"].calls == 1
+    assert stats.stages["score"].calls == 0
+
+
+def test_pages_share_the_index_passed_to_match_user():
+    async def keep_candidates(engine, db, ctx, batch, counts):
+        batch.results = [(job, {"score": 50}) for job, _ in batch.candidates]
+
+    engine = MatchEngine(RunStats(), stages=(("dedup", dedup_stage), ("collect", keep_candidates)))
+    index = MatchIndex()
+
+    async def run_pages():
+        # db=None: a preloaded index means dedup never queries the user's matches
+        first = await engine.match_user(None, _ctx(), [_job("a", "remote", "Backend")], index=index)
+        second = await engine.match_user(None, _ctx(), [_job("b", "remote", "Backend"), _job("c", "remote", "Data")], index=index)
+        return first, second
+
+    assert asyncio.run(run_pages()) == (1, 1)
+    assert {"a", "c"} <= index.job_ids
@@ -0,0 +1,8 @@
+from apps.ever_apply.models import Seniority
+from apps.ever_apply.services.features import job_features
+
+
+def test_seniority_hint_reads_the_title_only():
+    assert job_features("Senior Associate, Data", "Junior devs welcome")["seniority_hint"] == Seniority.SENIOR
+    assert job_features("Associate Engineer", "")["seniority_hint"] == Seniority.JUNIOR
+    assert job_features("Backend Engineer", "Senior stakeholders")["seniority_hint"] is None
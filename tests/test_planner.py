@@ -0,0 +1,17 @@
+from types import SimpleNamespace
+from apps.ever_apply.services.planner import plan_searches
+
+
+def _user(user_id: str, **prefs) -> SimpleNamespace:
+    return SimpleNamespace(id=user_id, parsed_data={"titles": ["Backend Engineer"]}, preferences=prefs)
+
+
+def test_null_preferred_location_plans_a_search_without_location():
+    groups = plan_searches([
+        _user("a", remote_type="onsite", preferred_location=None),
+        _user("b", remote_type="onsite"),
+    ])
+
+    assert len(groups) == 1
+    assert groups[0].location == ""
+    assert groups[0].user_ids == ["a", "b"]
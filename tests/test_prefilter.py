@@ -0,0 +1,31 @@
+from apps.ever_apply.services.prefilter import prefilter, required_tokens
+
+
+def test_rejects_jobs_without_skill_overlap():
+    parsed = {"skills": ["Python", "Machine Learning"], "titles": []}
+    candidates = [("ml", "We use python for machine learning."), ("sales", "Quota-carrying sales role.")]
+    keep, rejected = prefilter(parsed, candidates, min_overlap=1)
+    assert keep == [candidates[0]]
+    assert rejected == [candidates[1]]
+
+
+def test_resume_without_terms_skips_the_stage():
+    candidates = [("job", "Any description at all.")]
+    assert prefilter({"skills": [], "titles": []}, candidates, min_overlap=1) == (candidates, [])
+    assert required_tokens({"skills": [], "titles": []}) is None
+
+
+def test_required_tokens_cover_synonyms():
+    tokens = required_tokens({"skills": ["TypeScript"]})
+    assert "typescript" in tokens and "node.js" in tokens
+
+
+def test_required_tokens_match_the_stored_description_tokens():
+    from apps.ever_apply.services.prefilter import description_tokens
+
+    stored = description_tokens("Design of distributed systems for 3 teams, in Go.")
+    assert "of" not in stored and "3" not in stored
+    # A phrase is looked up by its first stored token, so a stopword lead still finds the job
+    assert set(required_tokens({"skills": ["Design of Systems", "Go"]})) <= set(stored)
+    # Nothing storable to look "IT" up by — the SQL predicate has to be skipped
+    assert required_tokens({"skills": ["IT", "Go"]}) is None
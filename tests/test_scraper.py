@@ -0,0 +1,125 @@
+import asyncio
+from types import SimpleNamespace
+from apps.ever_apply.services import scraper
+
+ACTOR_SECONDS = 0.3
+
+
+class FakeApify:
+    """Stands in for ApifyClientAsync — a slow actor run, then a paged dataset."""
+
+    def __init__(self, items: list[dict]) -> None:
+        self.items = items
+        self.running = 0
+        self.max_running = 0
+
+    def actor(self, name: str):
+        return self
+
+    async def call(self, run_input: dict, timeout_secs: int) -> dict:
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+        try:
+            await asyncio.sleep(ACTOR_SECONDS)
+        finally:
+            self.running -= 1
+        return {"defaultDatasetId": "dataset"}
+
+    def dataset(self, dataset_id: str):
+        return self
+
+    async def list_items(self, offset: int, limit: int):
+        return SimpleNamespace(items=self.items[offset:offset + limit], total=len(self.items))
+
+
+def _items(count: int) -> list[dict]:
+    return [
+        {"title": f"Engineer {i}", "company": "Acme", "url": f"https://indeed.test/{i}", "description": "Python and SQL."}
+        for i in range(count)
+    ]
+
+
+async def _scrape(keywords: list[str]) -> list[dict]:
+    return [job async for batch in scraper.stream_indeed_jobs(keywords) for job in batch]
+
+
+def test_event_loop_keeps_running_during_scrape(monkeypatch):
+    fake = FakeApify(_items(60))
+    monkeypatch.setattr(scraper, "apify", fake)
+
+    async def main():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        ticking = asyncio.create_task(ticker())
+        jobs = await _scrape(["python"])
+        ticking.cancel()
+        return jobs, ticks
+
+    jobs, ticks = asyncio.run(main())
+    assert len(jobs) == 60
+    # A blocked loop would barely tick while the actor runs; a free one ticks every ~10ms
+    assert ticks >= ACTOR_SECONDS / 0.01 / 2
+
+
+def test_concurrent_scrapes_share_the_actor_cap(monkeypatch):
+    fake = FakeApify(_items(5))
+    monkeypatch.setattr(scraper, "apify", fake)
+
+    async def main():
+        monkeypatch.setattr(scraper, "_apify_slots", asyncio.Semaphore(2))
+        return await asyncio.gather(*(_scrape([f"search {i}"]) for i in range(5)))
+
+    results = asyncio.run(main())
+    assert all(len(jobs) == 5 for jobs in results)
+    assert fake.max_running == 2
+
+
+def test_usage_records_the_whole_dataset_when_the_consumer_stops_early(monkeypatch):
+    monkeypatch.setattr(scraper, "apify", FakeApify(_items(60)))
+    monkeypatch.setattr(scraper.settings, "EVER_APPLY_INDEED_PAGE_SIZE", 20)
+    recorded = []
+    monkeypatch.setattr(scraper.recorder, "record", lambda provider, feature, **counts: recorded.append(counts))
+
+    async def first_page():
+        stream = scraper.stream_indeed_jobs(["python"])
+        batch = await anext(stream)
+        await stream.aclose()
+        return batch
+
+    assert len(asyncio.run(first_page())) == 20
+    # PPR bills all 60 dataset items, not just the 20 paged
+    assert recorded == [{"model": "borderline/indeed-scraper", "results": 60}]
+
+
+def test_normalized_job_carries_one_keyword_scan_into_ingest():
+    from apps.ever_apply.services.ingest import _job_row
+
+    job = scraper._normalize_job(
+        {"title": "Platform Engineer (Remote)", "description": "Active TS/SCI required.", "url": "https://example.com/1"},
+        "indeed",
+    )
+    assert job["remote_type"] == "remote"
+    assert job["keyword_families"] == {"clearance"}
+
+    row = _job_row(job)
+    assert row["requires_clearance"] is True
+    assert row["seniority_hint"] is None
+    assert "keyword_families" not in row
+
+
+def test_lever_workplace_type_maps_to_remote_type():
+    def lever(workplace_type: str, description: str = "Build APIs.") -> str | None:
+        posting = {"text": "Backend Engineer", "descriptionPlain": description, "hostedUrl": "https://jobs.lever.co/acme/1", "workplaceType": workplace_type}
+        return scraper._normalize_job(posting, "lever", company="acme")["remote_type"]
+
+    assert lever("on-site") == "onsite"
+    assert lever("remote") == "remote"
+    # "unspecified" isn't an answer — the posting text decides
+    assert lever("unspecified", "Hybrid, three days in the office.") == "hybrid"
+    assert lever("unspecified") is None
@@ -0,0 +1,30 @@
+import asyncio
+from types import SimpleNamespace
+from core.config import settings
+from apps.ever_apply import worker as worker_module
+from apps.ever_apply.services import tasks
+
+
+def test_loop_keeps_claiming_after_an_outcome_fails_to_record(monkeypatch):
+    queue = iter([SimpleNamespace(id=1, kind="cleanup_jobs"), SimpleNamespace(id=2, kind="cleanup_jobs")])
+    executed = []
+
+    async def claim_task(db, worker_id):
+        return next(queue, None)
+
+    async def execute(self, task, worker_id):
+        executed.append(task.id)
+        raise RuntimeError("payload string too long")
+
+    monkeypatch.setattr(tasks, "claim_task", claim_task)
+    monkeypatch.setattr(worker_module.TaskWorker, "_execute", execute)
+    monkeypatch.setattr(settings, "EVER_APPLY_WORKER_POLL_SECONDS", 0.01)
+
+    async def main():
+        worker = worker_module.TaskWorker()
+        await worker.start()
+        await asyncio.sleep(0.1)
+        await worker.stop()
+
+    asyncio.run(main())
+    assert executed == [1, 2]